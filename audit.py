@@ -0,0 +1,151 @@
+import json
+import math
+import os
+from collections import deque
+
+from economy import atomic_write
+from games import GAMES
+
+# ==========================================
+# ---------- RTP / HOUSE-EDGE AUDIT --------
+# ==========================================
+# Every settlement is folded into constant-size aggregates: lifetime totals,
+# a Welford mean/variance of the per-bet return (paid / stake), and a fixed
+# length rolling window. Nothing grows with the number of bets. Each game's
+# expected return comes from its GameSpec (see games/__init__.py).
+
+WINDOW_SIZE = 1000
+MIN_SAMPLES = 200
+Z_THRESHOLD = 4.0
+
+
+class RunningStats:
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def push(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def stderr(self):
+        return math.sqrt(self.variance / self.n) if self.n > 1 else 0.0
+
+
+class GameAudit:
+    def __init__(self, game, window_size=WINDOW_SIZE):
+        spec = GAMES.get(game)
+        self.game = game
+        self.expected = spec.expected_rtp if spec else None
+        self.ceiling = spec.rtp_ceiling if spec else False
+        self.wagered = 0
+        self.paid = 0
+        self.returns = RunningStats()
+        self.window = deque(maxlen=window_size)
+        self.window_wagered = 0
+        self.window_paid = 0
+
+    def record(self, stake, paid):
+        self.wagered += stake
+        self.paid += paid
+        self.returns.push(paid / stake)
+
+        if len(self.window) == self.window.maxlen:
+            old_stake, old_paid = self.window[0]
+            self.window_wagered -= old_stake
+            self.window_paid -= old_paid
+        self.window.append((stake, paid))
+        self.window_wagered += stake
+        self.window_paid += paid
+
+    @property
+    def rtp(self):
+        return self.paid / self.wagered if self.wagered else 0.0
+
+    @property
+    def window_rtp(self):
+        return self.window_paid / self.window_wagered if self.window_wagered else 0.0
+
+    @property
+    def house_edge(self):
+        return 1 - self.rtp
+
+    def zscore(self):
+        if self.expected is None or self.returns.n < MIN_SAMPLES or not self.returns.stderr:
+            return 0.0
+        return (self.returns.mean - self.expected) / self.returns.stderr
+
+    def flagged(self):
+        z = self.zscore()
+        if self.ceiling:
+            return z > Z_THRESHOLD
+        return abs(z) > Z_THRESHOLD
+
+    def to_dict(self):
+        return {
+            "wagered": self.wagered,
+            "paid": self.paid,
+            "n": self.returns.n,
+            "mean": self.returns.mean,
+            "m2": self.returns.m2,
+        }
+
+    @classmethod
+    def from_dict(cls, game, d):
+        audit = cls(game)
+        audit.wagered = d.get("wagered", 0)
+        audit.paid = d.get("paid", 0)
+        audit.returns = RunningStats(d.get("n", 0), d.get("mean", 0.0), d.get("m2", 0.0))
+        return audit
+
+
+class Auditor:
+    def __init__(self, path):
+        self.path = path
+        self.games = {}
+        self.flagged = set()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for game, d in json.load(f).items():
+                    self.games[game] = GameAudit.from_dict(game, d)
+
+    def record(self, game, stake, paid):
+        # Returns True the first time a game drifts out of bounds so the
+        # caller can alert once instead of on every bet.
+        if stake <= 0:
+            return False
+        audit = self.games.get(game)
+        if audit is None:
+            audit = self.games[game] = GameAudit(game)
+        audit.record(stake, paid)
+
+        if audit.flagged():
+            if game not in self.flagged:
+                self.flagged.add(game)
+                return True
+        else:
+            self.flagged.discard(game)
+        return False
+
+    def save(self):
+        atomic_write(self.path, json.dumps({g: a.to_dict() for g, a in self.games.items()}, indent=4))
+
+    def report(self):
+        lines = []
+        for game, a in sorted(self.games.items()):
+            flag = "🚩" if a.flagged() else "✅"
+            expected = f"{a.expected:.1%}" if a.expected is not None else "—"
+            lines.append(
+                f"{flag} **{game}** — RTP {a.rtp:.2%} (last {len(a.window)}: {a.window_rtp:.2%}, expected {expected})\n"
+                f"   wagered {a.wagered} | paid {a.paid} | edge {a.house_edge:+.2%} | "
+                f"n={a.returns.n} σ={math.sqrt(a.returns.variance):.2f} z={a.zscore():+.1f}"
+            )
+        return lines
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+
+# ==========================================
+# ---------- RENDER BENCHMARK --------------
+# ==========================================
+# Measures what one re-render of the blackjack, chicken and poker views
+# costs with the real discord.Embed: peak bytes allocated (tracemalloc) and
+# time per render. The "fresh" column builds a new Embed with the same text
+# on every render, which is what the views did before they kept one around.
+#
+#   python bench_render.py --renders 2000
+
+
+class StubUser:
+    def __init__(self, uid):
+        self.id = uid
+        self.mention = f"<@{uid}>"
+
+
+def peak_bytes(render, renders):
+    # Average peak allocation of a single render, measured in isolation.
+    total = 0
+    for _ in range(renders):
+        tracemalloc.start()
+        render()
+        total += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return total / renders
+
+
+def micros(render, renders):
+    start = time.perf_counter()
+    for _ in range(renders):
+        render()
+    return (time.perf_counter() - start) / renders * 1e6
+
+
+def fresh(discord, view, title, color):
+    def render():
+        e = discord.Embed(title=title, color=color)
+        e.description = view.embed().description
+        return e
+    return render
+
+
+async def run(args):
+    import discord
+    from games.blackjack import BlackjackGame, BlackjackView, BLURPLE
+    from games.chicken import ChickenGame, ChickenView, ORANGE
+    from games.poker import PokerGame, PokerView, GOLD
+
+    players = [StubUser(10**17 + i) for i in range(4)]
+
+    bj = BlackjackGame(100)
+    bj.hit()
+    bj_view = BlackjackView(bj, players[0])
+
+    chicken = ChickenGame(100, players[0])
+    chicken.crash = float("inf")
+    chicken.boost()
+    chicken_view = ChickenView(chicken, players[0])
+
+    poker = PokerGame(players, 100)
+    poker.deal_next()
+    poker_view = PokerView(poker, None)
+
+    cases = [
+        ("blackjack", bj_view, "🃏 Blackjack", BLURPLE),
+        ("chicken", chicken_view, "🐔 Chicken Game", ORANGE),
+        ("poker", poker_view, "♠️ Texas Hold’em", GOLD),
+    ]
+    print(f"discord.py {discord.__version__}, {args.renders} renders each")
+    print(f"{'view':<10} {'peak B':>8} {'fresh B':>8} {'µs':>7} {'fresh µs':>9}")
+    for name, view, title, color in cases:
+        baseline = fresh(discord, view, title, color)
+        print(
+            f"{name:<10} {peak_bytes(view.embed, args.renders):>8.0f} {peak_bytes(baseline, args.renders):>8.0f} "
+            f"{micros(view.embed, args.renders):>7.2f} {micros(baseline, args.renders):>9.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-render allocations of the game views")
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Importing the games pulls in the ledger, which reads DATA_DIR at import.
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    scratch = tempfile.mkdtemp(prefix="bench-render-")
+    os.environ["DATA_DIR"] = os.path.join(scratch, "guilds")
+    os.chdir(scratch)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import os
+import json
+import asyncio
+
+from games import ensure_stats
+
+# ==========================================
+# ---------- PER-GUILD ECONOMY STORE -------
+# ==========================================
+# Every guild gets its own partition: guilds/<id>.json for balances and
+# guilds/<id>.config.json for settings. Partitions are loaded the first time
+# a guild is touched and flushed on their own, so one busy guild only ever
+# rewrites its own file. Files are replaced atomically, never truncated in
+# place, so a crash mid-save leaves the previous copy intact.
+
+DATA_DIR = "guilds"
+FLUSH_DELAY = 1.0  # seconds to coalesce bursts of saves into one write
+
+DEFAULT_CONFIG = {
+    "start_balance": 1000,
+    "max_limbo_multiplier": 100,
+    "claim_amount": 1000,
+    "claim_threshold": 1000,
+    "claim_cooldown_hours": 1,
+}
+
+
+def atomic_write(path, payload):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Economy:
+    def __init__(self, guild_id, data_dir=DATA_DIR, legacy_file=None, on_commit=None, history=None):
+        self.guild_id = guild_id
+        self.path = os.path.join(data_dir, f"{guild_id}.json")
+        self.config_path = os.path.join(data_dir, f"{guild_id}.config.json")
+        self.dirty = False
+        self._flush_task = None
+        # save() bumps version; written is the version last known on disk.
+        # wait_written() lets a caller (the replication follower) hold an
+        # ack back until its save has actually been persisted.
+        self.version = 0
+        self.written = 0
+        self._waiters = []
+        # Users handed out by get_user() since the last save; each save()
+        # commits their current records to on_commit (replication).
+        self.touched = set()
+        self.on_commit = on_commit
+        # The guild's HistoryArchive, if any; its pending rows are written
+        # alongside the balances on every flush.
+        self.history = history
+
+        os.makedirs(data_dir, exist_ok=True)
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self.users = json.load(f)
+        elif legacy_file and os.path.exists(legacy_file):
+            # Pre-sharding single-guild data belongs to the original guild.
+            with open(legacy_file, "r") as f:
+                self.users = json.load(f)
+            self.write()
+        else:
+            self.users = {}
+        for u in self.users.values():
+            ensure_stats(u)
+            # Open coinflip orders and tournament buy-ins never survive a restart; hand back their stakes.
+            if u.get("escrow"):
+                u["balance"] += u["escrow"]
+                u["escrow"] = 0
+
+        self.config = dict(DEFAULT_CONFIG)
+        if os.path.exists(self.config_path):
+            with open(self.config_path, "r") as f:
+                self.config.update(json.load(f))
+
+    def get_user(self, uid, save=True):
+        # save=False leaves committing a new user to the caller, for loops
+        # that create many users and save once at the end.
+        uid = str(uid)
+        if uid not in self.users:
+            self.users[uid] = ensure_stats({"balance": self.config["start_balance"]})
+            self.touched.add(uid)
+            if save:
+                self.save()
+
+        self.touched.add(uid)
+
+        return self.users[uid]
+
+    def write(self):
+        if self.history:
+            self.history.flush()
+        atomic_write(self.path, json.dumps(self.users, indent=4))
+        self.dirty = False
+        self._mark_written(self.version)
+
+    def write_config(self):
+        atomic_write(self.config_path, json.dumps(self.config, indent=4))
+
+    def save(self):
+        # Inside the bot the write is deferred and coalesced per partition;
+        # outside an event loop (scripts, migrations) it happens right away.
+        self.dirty = True
+        self.version += 1
+        if self.on_commit and self.touched:
+            self.on_commit(self.guild_id, {uid: self.users[uid] for uid in self.touched})
+        self.touched.clear()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.write()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        # A save() that lands while the threaded write is running finds this
+        # task still alive and schedules nothing, so keep going until a write
+        # starts with nothing newer behind it.
+        while True:
+            await asyncio.sleep(FLUSH_DELAY)
+            if not self.dirty:
+                return
+            payload = json.dumps(self.users, indent=4)
+            version = self.version
+            self.dirty = False
+            job = self.history.begin_flush() if self.history else None
+            try:
+                await asyncio.to_thread(self._write_all, payload, job)
+            except Exception as e:
+                # Disk full, permissions...: hand everything back so the next
+                # round (or shutdown) writes it again instead of dropping it.
+                print(f"[economy] guild {self.guild_id} flush failed, retrying: {e!r}")
+                self.dirty = True
+                if job:
+                    self.history.abort_flush()
+                continue
+            if job:
+                self.history.end_flush()
+            self._mark_written(version)
+
+    def _write_all(self, payload, job):
+        # Worker thread: history rows first, so balances on disk never
+        # include a settlement the archive has lost.
+        if job:
+            self.history.write(*job)
+        atomic_write(self.path, payload)
+
+    def _mark_written(self, version):
+        self.written = max(self.written, version)
+        waiting = []
+        for v, fut in self._waiters:
+            if v <= self.written:
+                if not fut.done():
+                    fut.set_result(None)
+            else:
+                waiting.append((v, fut))
+        self._waiters = waiting
+
+    async def wait_written(self, version):
+        if self.written >= version:
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append((version, fut))
+        await fut
+
+    def flush(self):
+        if self.dirty:
+            self.write()
+
+    async def drain(self):
+        # Final flush from inside the loop: a threaded write still in flight
+        # shares the .tmp file with write(), so let it finish first.
+        if self._flush_task is not None and not self._flush_task.done():
+            await asyncio.wait([self._flush_task])
+        self.flush()
+
+
+class EconomyRegistry:
+    def __init__(self, data_dir=DATA_DIR, legacy_guild_id=None, legacy_file=None, on_commit=None, history=None):
+        self.data_dir = data_dir
+        self.legacy_guild_id = legacy_guild_id
+        self.legacy_file = legacy_file
+        self.on_commit = on_commit
+        self.history = history  # HistoryRegistry
+        self.partitions = {}
+
+    def __call__(self, guild_id):
+        eco = self.partitions.get(guild_id)
+        if eco is None:
+            legacy = self.legacy_file if guild_id == self.legacy_guild_id else None
+            archive = self.history(guild_id) if self.history else None
+            eco = self.partitions[guild_id] = Economy(guild_id, self.data_dir, legacy, self.on_commit, archive)
+        return eco
+
+    def guild_ids(self):
+        # Every partition on disk plus any that only exist in memory so far.
+        ids = set(self.partitions)
+        if os.path.isdir(self.data_dir):
+            for name in os.listdir(self.data_dir):
+                stem = name[:-len(".json")]
+                if name.endswith(".json") and stem.isdigit():
+                    ids.add(int(stem))
+        return sorted(ids)
+
+    def flush_all(self):
+        for eco in self.partitions.values():
+            eco.flush()
+
+    async def drain_all(self):
+        for eco in list(self.partitions.values()):
+            await eco.drain()
@@ -0,0 +1,82 @@
+# ==========================================
+# ---------- GAME REGISTRY -----------------
+# ==========================================
+# Every game is declared here with the stats it keeps per user and the hook
+# that updates them on settlement, its code in the transaction archive and
+# the return the RTP audit holds it to. Declaring a game does not import it:
+# the module (a discord.py extension with its slash commands) is only loaded
+# for games listed in ENABLED_GAMES.
+
+
+def count_wl(stats, stake, paid):
+    if paid > stake:
+        stats["wins"] += 1
+        return "wins"
+    if paid < stake:
+        stats["losses"] += 1
+        return "losses"
+    return None  # push
+
+
+class GameSpec:
+    # code: stored in the archive's game column, so it must never change or
+    # be reused (history.KINDS holds the codes of non-game settlements).
+    # expected_rtp: long-run mean of paid / stake per settlement; with
+    # rtp_ceiling only a return above it is flagged.
+    def __init__(self, name, module, code, expected_rtp=None, rtp_ceiling=False,
+                 stats=("wins", "losses"), on_settle=count_wl):
+        self.name = name
+        self.module = module
+        self.code = code
+        self.expected_rtp = expected_rtp
+        self.rtp_ceiling = rtp_ceiling
+        self.stats = stats
+        self.on_settle = on_settle
+
+
+GAMES = {}
+
+def register(name, module, code, **kwargs):
+    taken = next((g for g in GAMES.values() if g.code == code), None)
+    if taken:
+        raise ValueError(f"archive code {code} of {name!r} is already used by {taken.name!r}")
+    GAMES[name] = GameSpec(name, module, code, **kwargs)
+
+
+# Best play under this ruleset (single deck, 1:1 naturals, no peek, S17,
+# double on anything, split any rank): 0.960 +/- 0.001 per hand, from a 2M-hand
+# basic-strategy simulation against BlackjackGame. Misplay only lowers it.
+register("blackjack", "games.blackjack", 0, expected_rtp=0.96, rtp_ceiling=True)
+register("coinflip", "games.coinflip", 1, expected_rtp=1.0)
+# A cash-out at m >= 1.5 survives with P = 0.97 / m and pays m; rounding the
+# payout down only lowers it.
+register("chicken", "games.chicken", 2, expected_rtp=0.97, rtp_ceiling=True)
+register("limbo", "games.limbo", 3, expected_rtp=1.0)  # win chance is exactly 1 / multiplier
+register("poker", "games.poker", 4, expected_rtp=1.0)  # player-vs-player, the pot is only redistributed
+register("tournament", "games.tournament", 9, expected_rtp=1.0)  # the whole prize pool is paid out
+
+
+def ensure_stats(u):
+    # Fills in stats for games added since the user was created, and seeds
+    # the running totals from the per-game counters the first time.
+    for spec in GAMES.values():
+        stats = u.setdefault(spec.name, {})
+        for field in spec.stats:
+            stats.setdefault(field, 0)
+    if "total" not in u:
+        u["total"] = {
+            "wins": sum(u[g].get("wins", 0) for g in GAMES),
+            "losses": sum(u[g].get("losses", 0) for g in GAMES),
+        }
+    return u
+
+
+def record(u, game, stake, paid):
+    # Settlement hook: per-game stats plus the running W/L totals that /lb
+    # reads, so nothing has to be summed at display time.
+    spec = GAMES.get(game)
+    if spec is None:
+        return
+    outcome = spec.on_settle(u[game], stake, paid)
+    if outcome in u["total"]:
+        u["total"][outcome] += 1
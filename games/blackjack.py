@@ -0,0 +1,496 @@
+import random
+
+import discord
+from discord import app_commands
+from discord.ui import View, Button
+
+from ledger import get_user, save_data, settle
+from games.render import BLACKJACK_CARDS, POINTER
+
+BLURPLE = discord.Color.blurple()
+
+# ==========================================
+# ---------- BLACKJACK GAME LOGIC ----------
+# ==========================================
+
+class BlackjackGame:
+    # Table seats pass in the table's shoe and dealer hand so every seat
+    # draws from, and plays against, the same cards.
+    def __init__(self, bet, deck=None, dealer=None):
+        self.base_bet = bet
+        if deck is None:
+            deck = self.new_deck()
+            random.shuffle(deck)
+        self.deck = deck
+
+        self.hands = [[self.deck.pop(), self.deck.pop()]]
+        self.bets = [bet]
+        self.finished = [False]
+        self.doubled = [False]
+        self.active_hand = 0
+        self.dealer = dealer if dealer is not None else [self.deck.pop(), self.deck.pop()]
+        self._lines = {}  # hand index -> rendered line, dropped when that hand changes
+
+    @staticmethod
+    def new_deck(decks=1):
+        return list(BLACKJACK_CARDS) * decks
+
+    def value(self, hand):
+        total = sum(c["v"] for c in hand)
+        aces = sum(1 for c in hand if c["r"] == "A")
+        while total > 21 and aces:
+            total -= 10
+            aces -= 1
+        return total
+
+    def can_split(self):
+        hand = self.hands[self.active_hand]
+        return len(hand) == 2 and hand[0]["r"] == hand[1]["r"]
+
+    def split(self):
+        h = self.hands[self.active_hand]
+        c1, c2 = h
+        self.hands[self.active_hand] = [c1, self.deck.pop()]
+        self.hands.insert(self.active_hand + 1, [c2, self.deck.pop()])
+        self.bets.insert(self.active_hand + 1, self.base_bet)
+        self.finished.insert(self.active_hand + 1, False)
+        self.doubled.insert(self.active_hand + 1, False)
+        self._lines.clear()  # every later hand shifts index
+
+    def hit(self):
+        hand = self.hands[self.active_hand]
+        hand.append(self.deck.pop())
+        self._lines.pop(self.active_hand, None)
+        if self.value(hand) > 21:
+            self.finished[self.active_hand] = True
+
+    def stand(self):
+        self.finished[self.active_hand] = True
+
+    def double(self):
+        self.bets[self.active_hand] *= 2  # hit() below drops the cached line
+        self.doubled[self.active_hand] = True
+        self.hit()
+        self.finished[self.active_hand] = True
+
+    def next_hand(self):
+        while self.active_hand < len(self.hands) and self.finished[self.active_hand]:
+            self.active_hand += 1
+
+    def dealer_play(self):
+        while self.value(self.dealer) < 17:
+            self.dealer.append(self.deck.pop())
+
+    def fmt(self, hand):
+        return ", ".join([c["g"] for c in hand])
+
+    def hand_line(self, i):
+        line = self._lines.get(i)
+        if line is None:
+            hand = self.hands[i]
+            line = self._lines[i] = f"**Hand {i+1}:** {self.fmt(hand)} (Value: {self.value(hand)}) | Bet: {self.bets[i]}\n"
+        return line
+
+    def dealer_line(self, hide=True):
+        if hide:
+            return "?, " + self.dealer[1]["g"]
+        return self.fmt(self.dealer)
+
+    def done(self):
+        return self.active_hand >= len(self.hands)
+
+
+def settle_blackjack(game, guild_id, uid):
+    # Pays out every hand of a finished game against the (already played)
+    # dealer hand. Caller is responsible for save_data().
+    u = get_user(guild_id, uid)
+    dv = game.value(game.dealer)
+    result = ""
+
+    for i, hand in enumerate(game.hands):
+        pv = game.value(hand)
+        bet = game.bets[i]
+
+        if pv > 21:
+            settle(guild_id, uid, "blackjack", bet, 0)
+            result += f"❌ Hand {i+1} busted\n"
+
+        elif dv > 21 or pv > dv:
+            u["balance"] += bet * 2
+            settle(guild_id, uid, "blackjack", bet, bet * 2)
+            result += f"✅ Hand {i+1} wins\n"
+
+        elif pv < dv:
+            settle(guild_id, uid, "blackjack", bet, 0)
+            result += f"❌ Hand {i+1} loses\n"
+
+        else:
+            u["balance"] += bet
+            settle(guild_id, uid, "blackjack", bet, bet)
+            result += f"➖ Hand {i+1} push\n"
+
+    return result
+
+
+class BlackjackView(View):
+    def __init__(self, game, user):
+        super().__init__(timeout=90)
+        self.game = game
+        self.user = user
+        self._embed = discord.Embed(title="🃏 Blackjack", color=BLURPLE)
+
+    def embed(self, hide_dealer=True):
+        game = self.game
+        parts = []
+        for i in range(len(game.hands)):
+            if i == game.active_hand:
+                parts.append(POINTER)
+            parts.append(game.hand_line(i))
+        parts.append("\n**Dealer:** ")
+        parts.append(game.dealer_line(hide_dealer))
+
+        self._embed.description = "".join(parts)
+        return self._embed
+
+    async def advance(self, interaction):
+        self.game.next_hand()
+        if self.game.done():
+            await self.end_game(interaction)
+        else:
+            await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    async def end_game(self, interaction):
+        self.game.dealer_play()
+        embed = self.embed(hide_dealer=False)
+        embed.description += "\n" + settle_blackjack(self.game, interaction.guild_id, self.user.id)
+        save_data(interaction.guild_id)
+        self.stop()
+        await interaction.response.edit_message(embed=embed, view=None)
+
+    @discord.ui.button(label="Hit", style=discord.ButtonStyle.green)
+    async def hit(self, interaction: discord.Interaction, button: Button):
+        if interaction.user.id != self.user.id:
+            return await interaction.response.send_message("Not your game.", ephemeral=True)
+        self.game.hit()
+        await self.advance(interaction)
+
+    @discord.ui.button(label="Stand", style=discord.ButtonStyle.red)
+    async def stand(self, interaction: discord.Interaction, button: Button):
+        if interaction.user.id != self.user.id:
+            return await interaction.response.send_message("Not your game.", ephemeral=True)
+        self.game.stand()
+        await self.advance(interaction)
+
+    @discord.ui.button(label="Double", style=discord.ButtonStyle.blurple)
+    async def double(self, interaction: discord.Interaction, button: Button):
+        if interaction.user.id != self.user.id:
+            return await interaction.response.send_message("Not your game.", ephemeral=True)
+
+        u = get_user(interaction.guild_id, self.user.id)
+        bet = self.game.bets[self.game.active_hand]
+
+        if u["balance"] < bet:
+            return await interaction.response.send_message("Not enough balance to double.", ephemeral=True)
+
+        u["balance"] -= bet
+        self.game.double()
+        save_data(interaction.guild_id)
+        await self.advance(interaction)
+
+    @discord.ui.button(label="Split", style=discord.ButtonStyle.gray)
+    async def split(self, interaction: discord.Interaction, button: Button):
+        if interaction.user.id != self.user.id:
+            return await interaction.response.send_message("Not your game.", ephemeral=True)
+
+        if not self.game.can_split():
+            return await interaction.response.send_message("You can't split this hand.", ephemeral=True)
+
+        u = get_user(interaction.guild_id, self.user.id)
+        if u["balance"] < self.game.base_bet:
+            return await interaction.response.send_message("Not enough balance to split.", ephemeral=True)
+
+        u["balance"] -= self.game.base_bet
+        self.game.split()
+        save_data(interaction.guild_id)
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+
+# ==========================================
+# ---------- BLACKJACK TABLE MODE ----------
+# ==========================================
+
+TABLE_SEATS = 5
+TABLE_DECKS = 4
+TABLE_RESHUFFLE_AT = 52  # cards left in the shoe before it is rebuilt
+
+bj_tables = {}  # channel id -> BlackjackTable, kept between rounds so the shoe carries over
+
+
+class BlackjackTable:
+    def __init__(self, guild_id, channel_id):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.shoe = []
+        self._embed = discord.Embed(title="🃏 Blackjack Table", color=BLURPLE)
+        self.reset()
+
+    def reset(self):
+        # Starts a new round; the shoe carries over between rounds.
+        self.host = None
+        self.seats = []
+        self.games = {}
+        self.dealer = None
+        self.turn = 0
+        self.started = False
+        self.message = None
+
+    def seated(self, uid):
+        return any(user.id == uid for user, _ in self.seats)
+
+    def sit(self, user, bet):
+        if self.host is None:
+            self.host = user
+        self.seats.append((user, bet))
+
+    def deal(self):
+        if len(self.shoe) < TABLE_RESHUFFLE_AT + 11 * len(self.seats):
+            self.shoe = BlackjackGame.new_deck(TABLE_DECKS)
+            random.shuffle(self.shoe)
+        self.dealer = [self.shoe.pop(), self.shoe.pop()]
+        for user, bet in self.seats:
+            self.games[user.id] = BlackjackGame(bet, self.shoe, self.dealer)
+        self.started = True
+        self.advance()
+
+    def advance(self):
+        # Moves the turn to the next seat that still has an unfinished hand.
+        while self.turn < len(self.seats):
+            game = self.games[self.seats[self.turn][0].id]
+            game.next_hand()
+            if not game.done():
+                return
+            self.turn += 1
+
+    def current(self):
+        if self.turn < len(self.seats):
+            user = self.seats[self.turn][0]
+            return user, self.games[user.id]
+        return None, None
+
+    def finished(self):
+        return self.started and self.turn >= len(self.seats)
+
+    def settle(self):
+        # One dealer hand, one save for the whole table.
+        any_game = next(iter(self.games.values()))
+        any_game.dealer_play()
+        results = {}
+        for user, _ in self.seats:
+            results[user.id] = settle_blackjack(self.games[user.id], self.guild_id, user.id)
+        save_data(self.guild_id)
+        return results
+
+    def embed(self, results=None):
+        parts = []
+        if not self.started:
+            for user, bet in self.seats:
+                parts.append(f"🪑 {user.mention} — Bet: {bet}\n")
+            parts.append(f"\n{len(self.seats)}/{TABLE_SEATS} seats taken. Join with `/bjt`, {self.host.mention} deals.")
+            self._embed.description = "".join(parts)
+            return self._embed
+
+        current, _ = self.current()
+        for user, _ in self.seats:
+            game = self.games[user.id]
+            parts.append(user.mention)
+            parts.append("\n")
+            for i in range(len(game.hands)):
+                if user == current and i == game.active_hand:
+                    parts.append(POINTER)
+                parts.append(game.hand_line(i))
+            if results:
+                parts.append(results[user.id])
+            parts.append("\n")
+
+        any_game = next(iter(self.games.values()))
+        parts.append("**Dealer:** ")
+        if results:
+            parts.append(f"{any_game.dealer_line(hide=False)} (Value: {any_game.value(self.dealer)})")
+        else:
+            parts.append(any_game.dealer_line())
+        self._embed.description = "".join(parts)
+        return self._embed
+
+
+class BlackjackTableView(View):
+    def __init__(self, table):
+        super().__init__(timeout=120)
+        self.table = table
+
+    async def refresh(self, interaction):
+        if self.table.finished():
+            await self.end_round(interaction)
+        else:
+            await interaction.response.edit_message(embed=self.table.embed(), view=self)
+
+    async def end_round(self, interaction=None):
+        results = self.table.settle()
+        embed = self.table.embed(results)
+        message = self.table.message
+        self.table.reset()
+        self.stop()
+        if interaction:
+            await interaction.response.edit_message(embed=embed, view=None)
+        elif message:
+            await message.edit(embed=embed, view=None)
+
+    async def on_timeout(self):
+        table = self.table
+        if not table.started:
+            for user, bet in table.seats:
+                get_user(table.guild_id, user.id)["balance"] += bet
+            save_data(table.guild_id)
+            message = table.message
+            table.reset()
+            if message:
+                await message.edit(content="⌛ Table closed before dealing — bets refunded.", embed=None, view=None)
+            return
+        # Anyone still to act stands.
+        for game in table.games.values():
+            for i in range(len(game.hands)):
+                game.finished[i] = True
+        table.turn = len(table.seats)
+        await self.end_round()
+
+    async def check_turn(self, interaction):
+        if not self.table.started:
+            await interaction.response.send_message("The table hasn't been dealt yet.", ephemeral=True)
+            return None
+        user, game = self.table.current()
+        if user is None or interaction.user.id != user.id:
+            await interaction.response.send_message("Not your turn.", ephemeral=True)
+            return None
+        return game
+
+    @discord.ui.button(label="Deal", style=discord.ButtonStyle.gray)
+    async def deal(self, interaction: discord.Interaction, button: Button):
+        if self.table.started:
+            return await interaction.response.send_message("Cards are already dealt.", ephemeral=True)
+        if interaction.user.id != self.table.host.id:
+            return await interaction.response.send_message("Only the host can deal.", ephemeral=True)
+        self.table.deal()
+        button.disabled = True
+        await self.refresh(interaction)
+
+    @discord.ui.button(label="Hit", style=discord.ButtonStyle.green)
+    async def hit(self, interaction: discord.Interaction, button: Button):
+        game = await self.check_turn(interaction)
+        if not game:
+            return
+        game.hit()
+        self.table.advance()
+        await self.refresh(interaction)
+
+    @discord.ui.button(label="Stand", style=discord.ButtonStyle.red)
+    async def stand(self, interaction: discord.Interaction, button: Button):
+        game = await self.check_turn(interaction)
+        if not game:
+            return
+        game.stand()
+        self.table.advance()
+        await self.refresh(interaction)
+
+    @discord.ui.button(label="Double", style=discord.ButtonStyle.blurple)
+    async def double(self, interaction: discord.Interaction, button: Button):
+        game = await self.check_turn(interaction)
+        if not game:
+            return
+
+        u = get_user(interaction.guild_id, interaction.user.id)
+        bet = game.bets[game.active_hand]
+        if u["balance"] < bet:
+            return await interaction.response.send_message("Not enough balance to double.", ephemeral=True)
+
+        u["balance"] -= bet
+        game.double()
+        self.table.advance()
+        await self.refresh(interaction)
+
+    @discord.ui.button(label="Split", style=discord.ButtonStyle.gray)
+    async def split(self, interaction: discord.Interaction, button: Button):
+        game = await self.check_turn(interaction)
+        if not game:
+            return
+        if not game.can_split():
+            return await interaction.response.send_message("You can't split this hand.", ephemeral=True)
+
+        u = get_user(interaction.guild_id, interaction.user.id)
+        if u["balance"] < game.base_bet:
+            return await interaction.response.send_message("Not enough balance to split.", ephemeral=True)
+
+        u["balance"] -= game.base_bet
+        game.split()
+        await self.refresh(interaction)
+
+
+# ==========================================
+# ---------- SLASH COMMANDS ----------------
+# ==========================================
+
+@app_commands.command(name="bj")
+@app_commands.guild_only()
+async def bj(interaction: discord.Interaction, amount: int):
+    u = get_user(interaction.guild_id, interaction.user.id)
+
+    if amount <= 0 or amount > u["balance"]:
+        return await interaction.response.send_message("Invalid bet.", ephemeral=True)
+
+    # 🔒 TAKE MONEY UPFRONT
+    u["balance"] -= amount
+    save_data(interaction.guild_id)
+
+    game = BlackjackGame(amount)
+    view = BlackjackView(game, interaction.user)
+    await interaction.response.send_message(embed=view.embed(), view=view)
+
+
+@app_commands.command(name="bjt")
+@app_commands.guild_only()
+@app_commands.describe(amount="Bet")
+async def bjt(interaction: discord.Interaction, amount: int):
+    u = get_user(interaction.guild_id, interaction.user.id)
+
+    if amount <= 0 or amount > u["balance"]:
+        return await interaction.response.send_message("Invalid bet.", ephemeral=True)
+
+    table = bj_tables.get(interaction.channel_id)
+    if table and table.started:
+        return await interaction.response.send_message("A hand is in progress at this table, wait for the next round.", ephemeral=True)
+    if table and table.seated(interaction.user.id):
+        return await interaction.response.send_message("You're already seated.", ephemeral=True)
+    if table and len(table.seats) >= TABLE_SEATS:
+        return await interaction.response.send_message("The table is full.", ephemeral=True)
+
+    # 🔒 TAKE MONEY UPFRONT
+    u["balance"] -= amount
+    save_data(interaction.guild_id)
+
+    if not table:
+        table = bj_tables[interaction.channel_id] = BlackjackTable(interaction.guild_id, interaction.channel_id)
+    if table.host is None:
+        table.sit(interaction.user, amount)
+        await interaction.response.send_message(embed=table.embed(), view=BlackjackTableView(table))
+        table.message = await interaction.original_response()
+        if len(table.seats) > 1:
+            await table.message.edit(embed=table.embed())  # someone sat down while it was being posted
+        return
+
+    table.sit(interaction.user, amount)
+    if table.message is not None:  # otherwise the host's post picks the seat up once it exists
+        await table.message.edit(embed=table.embed())
+    await interaction.response.send_message(f"🪑 Seated with a **{amount}** bet.", ephemeral=True)
+
+
+async def setup(bot):
+    bot.tree.add_command(bj)
+    bot.tree.add_command(bjt)
@@ -0,0 +1,130 @@
+import random
+
+import discord
+from discord import app_commands
+from discord.ui import View, Button
+
+from ledger import get_user, save_data, settle
+from games.render import multiplier_text
+
+ORANGE = discord.Color.orange()
+CRASH_HIDDEN = "x**\n⚠️ Crash at: **???**"
+
+# ==========================================
+# ---------- CHICKEN GAME LOGIC ------------
+# ==========================================
+
+class ChickenGame:
+    def __init__(self, bet, user):
+        self.bet = bet
+        self.multiplier = 1.0
+        self.crash = min((1 / random.random()) * 0.97, 10.5)
+        self.finished = False
+
+    def boost(self):
+        if self.finished:
+            return False
+        self.multiplier += 0.5
+        if self.multiplier >= self.crash:
+            self.finished = True
+            return False
+        return True
+
+    def cashout(self):
+        self.finished = True
+        return int(self.bet * self.multiplier)
+
+
+class ChickenView(View):
+    def __init__(self, game, user):
+        super().__init__(timeout=60)
+        self.game = game
+        self.user = user
+        self.active = True
+        self._embed = discord.Embed(title="🐔 Chicken Game", color=ORANGE)
+        self._head = f"💰 Bet: **{self.game.bet}**\n🚀 Multiplier: **"
+
+    def embed(self):
+        self._embed.description = f"{self._head}{multiplier_text(self.game.multiplier)}{CRASH_HIDDEN}"
+        return self._embed
+
+    @discord.ui.button(label="⬆️ Boost", style=discord.ButtonStyle.green)
+    async def boost(self, interaction: discord.Interaction, button: Button):
+        if interaction.user.id != self.user.id:
+            return await interaction.response.send_message("Not your game.", ephemeral=True)
+        if not self.active:
+            return
+
+        alive = self.game.boost()
+
+        if alive:
+            await interaction.response.edit_message(embed=self.embed(), view=self)
+        else:
+            u = get_user(interaction.guild_id, self.user.id)
+            u["balance"] -= self.game.bet
+            settle(interaction.guild_id, self.user.id, "chicken", self.game.bet, 0)
+            save_data(interaction.guild_id)
+
+            self.active = False
+            self.stop()
+            await interaction.response.edit_message(
+                content=f"💥 **CRASHED at {self.game.multiplier:.1f}x** — You lost **{self.game.bet} dabloons**.",
+                embed=None,
+                view=None
+            )
+
+    @discord.ui.button(label="💰 Cash Out", style=discord.ButtonStyle.blurple)
+    async def cashout(self, interaction: discord.Interaction, button: Button):
+        if interaction.user.id != self.user.id:
+            return await interaction.response.send_message("Not your game.", ephemeral=True)
+        if not self.active:
+            return
+
+        self.active = False
+        self.stop()
+        winnings = self.game.cashout()
+
+        # Nothing was risked before the first boost: hand the bet back unsettled.
+        if self.game.multiplier <= 1.0:
+            return await interaction.response.edit_message(
+                content="↩️ **Cashed out at 1.0x** — your bet stays with you.",
+                embed=None,
+                view=None
+            )
+
+        # The stake is never taken up front, so only the profit is credited.
+        u = get_user(interaction.guild_id, self.user.id)
+        u["balance"] += winnings - self.game.bet
+        settle(interaction.guild_id, self.user.id, "chicken", self.game.bet, winnings)
+        save_data(interaction.guild_id)
+
+        await interaction.response.edit_message(
+            content=f"🏆 **Cashed out at {self.game.multiplier:.1f}x** — You won **{winnings - self.game.bet} dabloons!**",
+            embed=None,
+            view=None
+        )
+
+
+# ==========================================
+# ---------- SLASH COMMANDS ----------------
+# ==========================================
+
+@app_commands.command(name="chicken")
+@app_commands.guild_only()
+@app_commands.describe(amount="Bet amount")
+async def chicken(interaction: discord.Interaction, amount: int):
+    u = get_user(interaction.guild_id, interaction.user.id)
+
+    if amount <= 0:
+        return await interaction.response.send_message("❌ Invalid bet.", ephemeral=True)
+
+    if amount > u["balance"]:
+        return await interaction.response.send_message("❌ You don't have enough balance.", ephemeral=True)
+
+    game = ChickenGame(amount, interaction.user)
+    view = ChickenView(game, interaction.user)
+    await interaction.response.send_message(embed=view.embed(), view=view)
+
+
+async def setup(bot):
+    bot.tree.add_command(chicken)
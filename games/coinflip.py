@@ -0,0 +1,307 @@
+import time
+import heapq
+import random
+import asyncio
+from collections import deque
+
+import discord
+from discord import app_commands
+from discord.ui import View, Button
+
+from ledger import get_user, save_data, settle
+
+# ==========================================
+# ---------- COINFLIP COMPONENTS -----------
+# ==========================================
+
+class CoinflipView(View):
+    def __init__(self, challenger, opponent, amount, choice):
+        super().__init__(timeout=60)
+        self.challenger = challenger
+        self.opponent = opponent
+        self.amount = amount
+        self.choice = choice.lower()
+        self.result_sent = False
+
+    @discord.ui.button(label="Accept Coinflip", style=discord.ButtonStyle.green)
+    async def accept(self, interaction: discord.Interaction, button: Button):
+        if interaction.user.id != self.opponent.id:
+            return await interaction.response.send_message("You are not the opponent.", ephemeral=True)
+        if self.result_sent:
+            return
+
+        flip = random.choice(["heads", "tails"])
+        u = get_user(interaction.guild_id, self.challenger.id)
+        o = get_user(interaction.guild_id, self.opponent.id)
+
+        if flip == self.choice:
+            u["balance"] += self.amount
+            o["balance"] -= self.amount
+            settle(interaction.guild_id, self.challenger.id, "coinflip", self.amount, self.amount * 2, self.opponent.id)
+            settle(interaction.guild_id, self.opponent.id, "coinflip", self.amount, 0, self.challenger.id)
+            msg = f"🪙 **{flip.upper()}** — {self.challenger.mention} won **{self.amount}**!"
+        else:
+            u["balance"] -= self.amount
+            o["balance"] += self.amount
+            settle(interaction.guild_id, self.challenger.id, "coinflip", self.amount, 0, self.opponent.id)
+            settle(interaction.guild_id, self.opponent.id, "coinflip", self.amount, self.amount * 2, self.challenger.id)
+            msg = f"🪙 **{flip.upper()}** — {self.opponent.mention} won **{self.amount}**!"
+
+        save_data(interaction.guild_id)
+        self.result_sent = True
+        self.stop()
+        await interaction.response.edit_message(content=msg, view=None)
+
+
+# ==========================================
+# ---------- COINFLIP ORDER BOOK -----------
+# ==========================================
+# Open heads/tails stakes rest in per-side buckets keyed by the bit length
+# of the amount, so an incoming order checks its own size class first and
+# only ever scans a few dozen buckets. Orders can be partly filled by
+# several opposite orders. Fills are flipped and paid out in batches with a
+# single save per batch; unfilled remainders expire off a heap and are
+# refunded. Stakes are escrowed in u["escrow"] while resting.
+
+ORDER_TTL = 120  # seconds an unmatched order rests before it is refunded
+BATCH_DELAY = 0.5  # seconds fills are collected before they are settled
+
+SIDES = ("heads", "tails")
+
+
+class Order:
+    __slots__ = ("id", "user", "side", "amount", "remaining", "channel", "expires")
+
+    def __init__(self, order_id, user, side, amount, channel):
+        self.id = order_id
+        self.user = user
+        self.side = side
+        self.amount = amount
+        self.remaining = amount
+        self.channel = channel
+        self.expires = time.monotonic() + ORDER_TTL
+
+
+class CoinflipBook:
+    def __init__(self, guild_id):
+        self.guild_id = guild_id
+        self.buckets = {side: {} for side in SIDES}  # side -> bit length -> deque of orders
+        self.expiry = []  # heap of (expires, id, order)
+        self.fills = []
+        self.refunds = []
+        self.next_id = 0
+        self._batch_task = None
+        self._expiry_task = None
+
+    def place(self, user, side, amount, channel):
+        self.next_id += 1
+        order = Order(self.next_id, user, side, amount, channel)
+        opposite = self.buckets["tails" if side == "heads" else "heads"]
+        size = amount.bit_length()
+
+        # Closest sizes first: the exact bucket, then one size either side,
+        # and so on, until the order is filled or every bucket has been seen.
+        left, step = len(opposite), 0
+        while left and order.remaining:
+            b = size + (step + 1) // 2 * (1 if step % 2 else -1)
+            step += 1
+            queue = opposite.get(b)
+            if queue is None:
+                continue
+            left -= 1
+            own = []  # the taker's own resting orders keep their place in line
+            while queue and order.remaining:
+                resting = queue.popleft()
+                if not resting.remaining:
+                    continue  # filled or expired earlier
+                if resting.user.id == user.id:
+                    own.append(resting)
+                    continue
+                fill = min(resting.remaining, order.remaining)
+                resting.remaining -= fill
+                order.remaining -= fill
+                self.fills.append((resting, order, fill))
+                if resting.remaining:
+                    queue.appendleft(resting)
+            queue.extendleft(reversed(own))
+            if not queue:
+                del opposite[b]
+
+        if order.remaining:
+            self.buckets[side].setdefault(size, deque()).append(order)
+            heapq.heappush(self.expiry, (order.expires, order.id, order))
+            if self._expiry_task is None or self._expiry_task.done():
+                self._expiry_task = asyncio.create_task(self._expire_loop())
+        if self.fills:
+            self._schedule_flush()
+        return order
+
+    def _schedule_flush(self):
+        if self._batch_task is None or self._batch_task.done():
+            self._batch_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(BATCH_DELAY)
+        await self.flush()
+
+    async def _expire_loop(self):
+        while self.expiry:
+            delay = self.expiry[0][0] - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            _, _, order = heapq.heappop(self.expiry)
+            if order.remaining:
+                self.refunds.append((order, order.remaining))
+                order.remaining = 0  # its queue entry is dropped on the next scan
+                self._schedule_flush()
+
+    def settle_batch(self):
+        # Pays out every pending fill and refund; returns result lines per channel.
+        gid = self.guild_id
+        lines = {}
+
+        for maker, taker, fill in self.fills:
+            flip = random.choice(SIDES)
+            winner, loser = (maker, taker) if flip == maker.side else (taker, maker)
+            w = get_user(gid, winner.user.id)
+            l = get_user(gid, loser.user.id)
+            w["escrow"] -= fill
+            l["escrow"] -= fill
+            w["balance"] += fill * 2
+            settle(gid, winner.user.id, "coinflip", fill, fill * 2, loser.user.id)
+            settle(gid, loser.user.id, "coinflip", fill, 0, winner.user.id)
+            line = (
+                f"🪙 **{flip.upper()}** — {winner.user.mention} beat {loser.user.mention} "
+                f"for **{fill}** (+{fill})"
+            )
+            for order in {maker.channel.id: maker, taker.channel.id: taker}.values():
+                lines.setdefault(order.channel, []).append(line)
+
+        for order, amount in self.refunds:
+            u = get_user(gid, order.user.id)
+            u["escrow"] -= amount
+            u["balance"] += amount
+            lines.setdefault(order.channel, []).append(
+                f"⌛ {order.user.mention}'s **{order.side}** order closed unmatched — **{amount}** refunded."
+            )
+
+        if self.fills or self.refunds:
+            save_data(gid)
+        self.fills = []
+        self.refunds = []
+        return lines
+
+    async def flush(self):
+        for channel, lines in self.settle_batch().items():
+            await channel.send("\n".join(lines)[:2000])
+
+    def cancel_all(self):
+        # Refund everything still resting (extension unload / shutdown).
+        for _, _, order in self.expiry:
+            if order.remaining:
+                self.refunds.append((order, order.remaining))
+                order.remaining = 0
+        self.expiry = []
+        return self.settle_batch()
+
+    def depth(self):
+        return {
+            side: sum(o.remaining for q in self.buckets[side].values() for o in q)
+            for side in SIDES
+        }
+
+
+books = {}  # guild id -> CoinflipBook
+
+def book(guild_id):
+    if guild_id not in books:
+        books[guild_id] = CoinflipBook(guild_id)
+    return books[guild_id]
+
+
+# ==========================================
+# ---------- SLASH COMMANDS ----------------
+# ==========================================
+
+@app_commands.command(name="cf")
+@app_commands.guild_only()
+@app_commands.describe(amount="Bet", choice="heads or tails", user="Opponent (optional)")
+async def cf(interaction: discord.Interaction, amount: int, choice: str, user: discord.User | None = None):
+    choice = choice.lower()
+    u = get_user(interaction.guild_id, interaction.user.id)
+
+    if choice not in ["heads", "tails"]:
+        return await interaction.response.send_message("heads or tails only.", ephemeral=True)
+    if amount <= 0 or amount > u["balance"]:
+        return await interaction.response.send_message("Invalid bet.", ephemeral=True)
+    if user and user.id == interaction.user.id:
+        return await interaction.response.send_message("You can't coinflip yourself.", ephemeral=True)
+
+    if not user:
+        flip = random.choice(["heads", "tails"])
+        if flip == choice:
+            u["balance"] += amount
+            settle(interaction.guild_id, interaction.user.id, "coinflip", amount, amount * 2)
+            msg = f"🪙 **{flip.upper()}** — You won **{amount}**!"
+        else:
+            u["balance"] -= amount
+            settle(interaction.guild_id, interaction.user.id, "coinflip", amount, 0)
+            msg = f"🪙 **{flip.upper()}** — You lost **{amount}**."
+        save_data(interaction.guild_id)
+        return await interaction.response.send_message(msg)
+
+    opponent = get_user(interaction.guild_id, user.id)
+    if opponent["balance"] < amount:
+        return await interaction.response.send_message(f"{user.mention} doesn't have enough balance.", ephemeral=True)
+
+    view = CoinflipView(interaction.user, user, amount, choice)
+    await interaction.response.send_message(
+        f"🪙 **Coinflip Challenge**\n{interaction.user.mention} vs {user.mention}\n"
+        f"Bet: **{amount} dabloons**\n{user.mention}, click **Accept Coinflip**",
+        view=view
+    )
+
+
+@app_commands.command(name="cfo")
+@app_commands.guild_only()
+@app_commands.describe(amount="Stake", choice="heads or tails")
+async def cfo(interaction: discord.Interaction, amount: int, choice: str):
+    choice = choice.lower()
+    u = get_user(interaction.guild_id, interaction.user.id)
+
+    if choice not in SIDES:
+        return await interaction.response.send_message("heads or tails only.", ephemeral=True)
+    if amount <= 0 or amount > u["balance"]:
+        return await interaction.response.send_message("Invalid bet.", ephemeral=True)
+
+    # 🔒 ESCROW UPFRONT (persisted with the next settlement batch)
+    u["balance"] -= amount
+    u["escrow"] = u.get("escrow", 0) + amount
+
+    b = book(interaction.guild_id)
+    order = b.place(interaction.user, choice, amount, interaction.channel)
+    filled = amount - order.remaining
+    depth = b.depth()
+
+    if order.remaining == 0:
+        status = f"✅ Fully matched **{amount}** — results incoming."
+    elif filled:
+        status = f"🔀 Matched **{filled}**, **{order.remaining}** resting for {ORDER_TTL}s."
+    else:
+        status = f"📥 **{amount}** resting for {ORDER_TTL}s."
+    await interaction.response.send_message(
+        f"🪙 {interaction.user.mention} put **{amount}** on **{choice}**\n{status}\n"
+        f"📖 Open: heads **{depth['heads']}** | tails **{depth['tails']}**"
+    )
+
+
+async def setup(bot):
+    bot.tree.add_command(cf)
+    bot.tree.add_command(cfo)
+
+
+async def teardown(bot):
+    for b in books.values():
+        for channel, lines in b.cancel_all().items():
+            await channel.send("\n".join(lines)[:2000])
@@ -0,0 +1,51 @@
+import random
+
+import discord
+from discord import app_commands
+
+from ledger import get_user, save_data, settle, guild_config
+
+# ==========================================
+# ---------- LIMBO -------------------------
+# ==========================================
+
+@app_commands.command(name="limbo")
+@app_commands.guild_only()
+@app_commands.describe(amount="Bet amount", multiplier="Target multiplier (2–100)")
+async def limbo(interaction: discord.Interaction, amount: int, multiplier: int):
+    u = get_user(interaction.guild_id, interaction.user.id)
+    max_multiplier = guild_config(interaction.guild_id)["max_limbo_multiplier"]
+
+    if amount <= 0 or amount > u["balance"]:
+        return await interaction.response.send_message("❌ Invalid bet amount.", ephemeral=True)
+
+    if multiplier < 2 or multiplier > max_multiplier:
+        return await interaction.response.send_message(f"❌ Multiplier must be between **2x** and **{max_multiplier}x**.", ephemeral=True)
+
+    win_chance = 1 / multiplier
+    roll = random.random()
+
+    if roll <= win_chance:
+        profit = amount * (multiplier - 1)
+        u["balance"] += profit
+        settle(interaction.guild_id, interaction.user.id, "limbo", amount, amount * multiplier)
+        msg = (
+            f"🚀 **LIMBO WIN!**\n"
+            f"🎯 Target: **{multiplier}x**\n"
+            f"💰 Profit: **+{profit} dabloons**"
+        )
+    else:
+        u["balance"] -= amount
+        settle(interaction.guild_id, interaction.user.id, "limbo", amount, 0)
+        msg = (
+            f"💥 **LIMBO CRASHED!**\n"
+            f"🎯 Target: **{multiplier}x**\n"
+            f"💸 Lost: **-{amount} dabloons**"
+        )
+
+    save_data(interaction.guild_id)
+    await interaction.response.send_message(msg)
+
+
+async def setup(bot):
+    bot.tree.add_command(limbo)
@@ -0,0 +1,256 @@
+import random
+
+import discord
+from discord import app_commands
+from discord.ui import View, Button
+
+from ledger import get_user, save_data, settle
+from games.render import POKER_CARDS
+
+GOLD = discord.Color.gold()
+
+# ==========================================
+# ---------- POKER GAME LOGIC ------------
+# ==========================================
+
+RANKS = "23456789TJQKA"
+SUITS = "♠♥♦♣"
+
+def new_deck():
+    return list(POKER_CARDS)
+
+def rv(r):
+    return RANKS.index(r)
+
+def hand_rank(cards):
+    vals = sorted([rv(c[0]) for c in cards], reverse=True)
+    suits = [c[1] for c in cards]
+    counts = {v: vals.count(v) for v in set(vals)}
+    freq = sorted(counts.values(), reverse=True)
+
+    flush = len(set(suits)) == 1
+    straight = vals == list(range(vals[0], vals[0]-5, -1))
+
+    if straight and flush: return (8, vals)
+    if 4 in freq: return (7, vals)
+    if freq == [3,2]: return (6, vals)
+    if flush: return (5, vals)
+    if straight: return (4, vals)
+    if 3 in freq: return (3, vals)
+    if freq == [2,2,1]: return (2, vals)
+    if 2 in freq: return (1, vals)
+    return (0, vals)
+
+class PokerGame:
+    def __init__(self, players, buyin):
+        self.players = players
+        self.active = players.copy()
+        self.buyin = buyin
+        self.contributions = {p.id: buyin for p in players}
+        self.pot = buyin * len(players)
+        self.deck = new_deck()
+        random.shuffle(self.deck)
+        self.hands = {p.id: [self.deck.pop(), self.deck.pop()] for p in players}
+        self.board = []
+        self.board_text = "—"  # re-joined only when a street is dealt
+        self.turn = 0
+        self.round = 0
+
+    def deal_next(self):
+        self.round += 1
+        if self.round == 1:
+            self.board += [self.deck.pop() for _ in range(3)]
+        elif self.round in (2, 3):
+            self.board.append(self.deck.pop())
+        else:
+            return
+        self.board_text = " ".join(self.board)
+
+# ------------------------------------------
+# ---------- POKER VIEW --------------------
+# ------------------------------------------
+
+class PokerView(View):
+    def __init__(self, game, channel):
+        super().__init__(timeout=180)
+        self.game = game
+        self.channel = channel
+        self._embed = discord.Embed(title="♠️ Texas Hold’em", color=GOLD)
+
+    def current(self):
+        return self.game.active[self.game.turn % len(self.game.active)]
+
+    def embed(self):
+        self._embed.description = (
+            f"🃏 Board: {self.game.board_text}\n"
+            f"💰 Pot: {self.game.pot}\n"
+            f"➡️ Turn: {self.current().mention}"
+        )
+        return self._embed
+
+    async def next_turn(self):
+        self.game.turn += 1
+        if self.game.turn % len(self.game.active) == 0:
+            self.game.deal_next()
+        if self.game.round >= 4 or len(self.game.active) == 1:
+            await self.finish()
+        else:
+            await self.channel.send(embed=self.embed(), view=self)
+
+    async def finish(self):
+        ranks = {p.id: hand_rank(self.game.hands[p.id] + self.game.board) for p in self.game.active}
+        best = max(ranks.values())
+        winners = [p for p in self.game.active if ranks[p.id] == best]
+        payout = self.game.pot // len(winners)
+
+        for w in winners:
+            get_user(self.channel.guild.id, w.id)["balance"] += payout
+        for p in self.game.players:
+            settle(self.channel.guild.id, p.id, "poker", self.game.contributions[p.id], payout if p in winners else 0)
+        save_data(self.channel.guild.id)
+
+        desc = f"🃏 Board: {' '.join(self.game.board)}\n\n"
+        for p in self.game.players:
+            spent = self.game.contributions[p.id]
+            earned = payout if p in winners else 0
+            profit = earned - spent
+            sign = "+" if profit >= 0 else ""
+            desc += f"{p.mention}: {' '.join(self.game.hands[p.id])}\n💵 **{sign}{profit} dabloons**\n\n"
+
+        await self.channel.send(embed=discord.Embed(title="🏆 Poker Showdown", description=desc, color=discord.Color.green()))
+        self.stop()
+
+    @discord.ui.button(label="Check / Call", style=discord.ButtonStyle.green)
+    async def call(self, interaction: discord.Interaction, _):
+        if interaction.user != self.current():
+            return await interaction.response.send_message("Not your turn.", ephemeral=True)
+        await interaction.response.defer()
+        await self.next_turn()
+
+    @discord.ui.button(label="Raise", style=discord.ButtonStyle.blurple)
+    async def raise_bet(self, interaction: discord.Interaction, _):
+        if interaction.user != self.current():
+            return await interaction.response.send_message("Not your turn.", ephemeral=True)
+
+        u = get_user(interaction.guild_id, interaction.user.id)
+        if u["balance"] < self.game.buyin:
+            return await interaction.response.send_message("Not enough balance.", ephemeral=True)
+
+        u["balance"] -= self.game.buyin
+        self.game.pot += self.game.buyin
+        self.game.contributions[interaction.user.id] += self.game.buyin
+        save_data(interaction.guild_id)
+
+        await interaction.response.defer()
+        await self.next_turn()
+
+    @discord.ui.button(label="Fold", style=discord.ButtonStyle.red)
+    async def fold(self, interaction: discord.Interaction, _):
+        if interaction.user != self.current():
+            return await interaction.response.send_message("Not your turn.", ephemeral=True)
+
+        self.game.active.remove(interaction.user)
+        await interaction.response.defer()
+        await self.next_turn()
+
+
+
+
+
+class PokerRequestView(View):
+    def __init__(self, challenger, opponents, buyin):
+        super().__init__(timeout=120)
+        self.challenger = challenger
+        self.opponents = {u.id: u for u in opponents}
+        self.buyin = buyin
+        self.accepted = {challenger.id}  # challenger auto-accepts
+        self.done = False
+
+    async def try_start(self, interaction):
+        # Start game if all accepted
+        if set(self.accepted) == set(self.opponents.keys()) | {self.challenger.id}:
+            self.done = True
+            # Deduct buy-ins
+            all_players = [self.challenger] + list(self.opponents.values())
+            for p in all_players:
+                get_user(interaction.guild_id, p.id)["balance"] -= self.buyin
+            save_data(interaction.guild_id)
+
+            # Initialize game
+            game = PokerGame(all_players, self.buyin)
+            view = PokerView(game, interaction.channel)
+
+            # DM hands
+            for p in all_players:
+                try:
+                    await p.send(embed=discord.Embed(
+                        title="🂡 Your Poker Hand",
+                        description=" ".join(game.hands[p.id]),
+                        color=discord.Color.blurple()
+                    ))
+                except discord.Forbidden:
+                    # Refund everyone if DM fails
+                    for r in all_players:
+                        get_user(interaction.guild_id, r.id)["balance"] += self.buyin
+                    save_data(interaction.guild_id)
+                    await interaction.channel.send(f"⚠️ Could not DM {p.mention}. Game cancelled.")
+                    self.stop()
+                    return
+
+            # Send main game message
+            await interaction.channel.send(embed=view.embed(), view=view)
+            self.stop()
+
+    @discord.ui.button(label="Accept Poker", style=discord.ButtonStyle.green)
+    async def accept(self, interaction: discord.Interaction, button: Button):
+        if interaction.user.id not in self.opponents:
+            return await interaction.response.send_message("You're not invited to this game.", ephemeral=True)
+        if interaction.user.id in self.accepted:
+            return await interaction.response.send_message("You already accepted.", ephemeral=True)
+
+        self.accepted.add(interaction.user.id)
+        await interaction.response.send_message("✅ You accepted the poker game!", ephemeral=True)
+        await self.try_start(interaction)
+
+    @discord.ui.button(label="Decline Poker", style=discord.ButtonStyle.red)
+    async def decline(self, interaction: discord.Interaction, button: Button):
+        if interaction.user.id not in self.opponents:
+            return await interaction.response.send_message("You're not invited to this game.", ephemeral=True)
+        self.done = True
+        await interaction.channel.send(f"❌ {interaction.user.mention} declined the poker game. Game cancelled.")
+        self.stop()
+
+
+# ==========================================
+# ---------- SLASH COMMANDS ----------------
+# ==========================================
+
+@app_commands.command(name="p")
+@app_commands.guild_only()
+async def poker(interaction: discord.Interaction, amount: int,
+                user1: discord.User | None = None,
+                user2: discord.User | None = None,
+                user3: discord.User | None = None):
+
+    players = [u for u in (user1, user2, user3) if u]
+    if not 1 <= len(players) <= 3:
+        return await interaction.response.send_message("You must invite 1–3 opponents.", ephemeral=True)
+
+    all_players = [interaction.user] + players
+
+    # Check balances before sending request
+    for p in all_players:
+        if get_user(interaction.guild_id, p.id)["balance"] < amount:
+            return await interaction.response.send_message(f"{p.mention} lacks balance.", ephemeral=True)
+
+    view = PokerRequestView(interaction.user, players, amount)
+    await interaction.response.send_message(
+        f"🃏 {interaction.user.mention} has challenged {', '.join(u.mention for u in players)} to a poker game!\n"
+        f"💰 Buy-in: **{amount} dabloons** each\n\n"
+        f"All invited players must accept to start the game.",
+        view=view
+    )
+
+
+async def setup(bot):
+    bot.tree.add_command(poker)
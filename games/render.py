@@ -0,0 +1,31 @@
+import sys
+
+# ==========================================
+# ---------- RENDER CACHE ------------------
+# ==========================================
+# Card glyphs are built once per process and shared by every deck, so
+# formatting a hand is a join over strings that already exist. Views keep
+# one Embed each and only swap its description.
+
+SUITS = "♠♥♦♣"
+BLACKJACK_RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
+POKER_RANKS = "23456789TJQKA"
+
+# Blackjack cards are shared, read-only dicts; "g" is the display glyph.
+BLACKJACK_CARDS = tuple(
+    {"r": r, "s": s, "v": 11 if r == "A" else 10 if r in ["J", "Q", "K"] else int(r), "g": sys.intern(r + s)}
+    for s in SUITS for r in BLACKJACK_RANKS
+)
+
+POKER_CARDS = tuple(sys.intern(r + s) for r in POKER_RANKS for s in SUITS)
+
+POINTER = "➡️ "
+
+_multipliers = {}
+
+def multiplier_text(m):
+    # Chicken multipliers step by 0.5 and are capped, so this stays tiny.
+    text = _multipliers.get(m)
+    if text is None:
+        text = _multipliers[m] = f"{m:.1f}"
+    return text
@@ -0,0 +1,548 @@
+import math
+import heapq
+import random
+import asyncio
+
+import discord
+from discord import app_commands
+from discord.ui import View, Button
+
+from ledger import get_user, save_data, settle
+from games.poker import PokerGame, hand_rank
+
+# ==========================================
+# ---------- TOURNAMENT CONFIGURATION ------
+# ==========================================
+# Buy-ins are escrowed in u["escrow"] until the final payout, so a restart
+# mid-tournament refunds everyone (see Economy.load). Chips only exist for
+# the life of a tournament.
+
+STARTING_CHIPS = 1000
+TABLE_SIZE = 6
+MIN_PLAYERS = 2
+BLINDS = (10, 20, 30, 50, 75, 100, 150, 200, 300, 400, 600, 800, 1000, 1500, 2000, 3000)
+LEVEL_SECONDS = 300  # blinds go up this often, for every table at once
+ACTION_SECONDS = 45  # a player who doesn't act in time checks, or folds if facing a bet
+HAND_PAUSE = 3  # seconds between hands at a table
+REGISTRATION_SECONDS = 900  # unstarted tournaments are cancelled and refunded
+
+# Share of the prize pool per finishing place, by field size.
+PAYOUTS = (
+    (4, (1.0,)),
+    (9, (0.65, 0.35)),
+    (20, (0.5, 0.3, 0.2)),
+    (None, (0.4, 0.25, 0.15, 0.1, 0.06, 0.04)),
+)
+
+def payout_shares(entrants):
+    for limit, shares in PAYOUTS:
+        if limit is None or entrants <= limit:
+            return shares
+
+# ==========================================
+# ---------- SHARED SCHEDULER --------------
+# ==========================================
+# Every timer of every tournament (blind levels, action clocks, the pause
+# between hands) sits in one heap behind a single loop.call_at handle that is
+# re-armed for the earliest entry, so idle tables cost nothing and no table
+# owns a task. Timers are never cancelled: callbacks carry a token and
+# ignore themselves when it is stale.
+
+class Scheduler:
+    def __init__(self):
+        self.timers = []  # heap of (when, seq, fn, args)
+        self.seq = 0
+        self.fired = 0
+        self._handle = None
+        self._armed = None
+        self._running = set()  # tasks of coroutine callbacks still in flight
+
+    def call_later(self, delay, fn, *args):
+        loop = asyncio.get_running_loop()
+        self.seq += 1
+        heapq.heappush(self.timers, (loop.time() + delay, self.seq, fn, args))
+        if self._handle is None or self.timers[0][0] < self._armed:
+            self._arm(loop)
+
+    def _arm(self, loop):
+        if self._handle:
+            self._handle.cancel()
+        self._armed = self.timers[0][0]
+        self._handle = loop.call_at(self._armed, self._fire)
+
+    def _fire(self):
+        loop = asyncio.get_running_loop()
+        self._handle = None
+        now = loop.time()
+        while self.timers and self.timers[0][0] <= now:
+            _, _, fn, args = heapq.heappop(self.timers)
+            self.fired += 1
+            try:
+                result = fn(*args)
+            except Exception as e:
+                print(f"[tournament] timer {fn.__qualname__} failed: {e!r}")
+                continue
+            if asyncio.iscoroutine(result):
+                task = loop.create_task(result)
+                self._running.add(task)
+                task.add_done_callback(self._done)
+        if self.timers and self._handle is None:
+            self._arm(loop)
+
+    def _done(self, task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"[tournament] timer task failed: {task.exception()!r}")
+
+
+scheduler = Scheduler()
+
+# ==========================================
+# ---------- TOURNAMENT HANDS --------------
+# ==========================================
+
+class TournamentHand(PokerGame):
+    # A PokerGame played for chips: the blind is the buy-in, short stacks
+    # post what they have, and calls have to match the biggest contribution.
+    def __init__(self, players, blind, chips):
+        super().__init__(players, blind)
+        self.stacks = {p.id: chips[p.id] for p in players}
+        self.contributions = {p.id: min(blind, chips[p.id]) for p in players}
+        self.pot = sum(self.contributions.values())
+        # Players who still owe an action this street; the street closes
+        # when it is empty. A raise puts everyone else with chips back in.
+        self.to_act = {p.id for p in players if self.stacks[p.id] > self.contributions[p.id]}
+        # Bumped every time a player is put on the clock. Unlike turn it
+        # never repeats within a hand, so it is the action clock's token.
+        self.actions = 0
+
+    def to_call(self, uid):
+        return max(self.contributions.values()) - self.contributions[uid]
+
+
+def split_pot(contributions, ranks):
+    # Side pots: each slice between two contribution levels goes to the best
+    # hand among players still in who paid that much. Chips nobody still in
+    # could contest go to the best hand overall. Returns {uid: chips won}.
+    won = {uid: 0 for uid in ranks}
+    prev = 0
+    for level in sorted(set(contributions.values())):
+        pot = sum(min(c, level) - min(c, prev) for c in contributions.values())
+        eligible = [uid for uid in ranks if contributions[uid] >= level] or list(ranks)
+        best = max(ranks[uid] for uid in eligible)
+        winners = [uid for uid in eligible if ranks[uid] == best]
+        share, odd = divmod(pot, len(winners))
+        for i, uid in enumerate(winners):
+            won[uid] += share + (1 if i < odd else 0)
+        prev = level
+    return won
+
+# ------------------------------------------
+# ---------- TABLES ------------------------
+# ------------------------------------------
+
+class TournamentTable:
+    def __init__(self, tournament, number, channel):
+        self.tournament = tournament
+        self.number = number
+        self.channel = channel
+        self.seats = []  # players join and leave only between hands
+        self.game = None
+        self.hand_no = 0
+        self.pending = False  # next hand already scheduled
+        self.view = TableView(self)
+        self._embed = discord.Embed(title=f"♠️ Table {number}", color=discord.Color.gold())
+
+    def current(self):
+        return self.game.active[self.game.turn % len(self.game.active)]
+
+    def schedule_hand(self, delay):
+        if not self.pending:
+            self.pending = True
+            self.tournament.scheduler.call_later(delay, self.start_hand)
+
+    async def start_hand(self):
+        t = self.tournament
+        self.pending = False
+        if t.finished or self.game or self not in t.tables or len(self.seats) < 2:
+            return
+        self.hand_no += 1
+        self.seats.append(self.seats.pop(0))  # rotate who acts first
+        self.game = TournamentHand(list(self.seats), t.blind, t.chips)
+        for p in self.seats:
+            t.chips[p.id] -= self.game.contributions[p.id]
+        await self.advance(skip_first=False)
+
+    def check(self, user, action):
+        if self.tournament.finished:
+            return "The tournament is over."
+        if self.game is None or user.id != self.current().id:
+            return "Not your turn."
+        if action == "raise" and self.tournament.chips[user.id] <= self.game.to_call(user.id):
+            return "Not enough chips to raise, call to go all in."
+        return None
+
+    async def act(self, user, action):
+        # Re-checked here because the caller may have awaited since its own
+        # check; everything up to advance() runs without yielding. Returns
+        # an error string when the action no longer applies.
+        error = self.check(user, action)
+        if error:
+            return error
+        g, chips = self.game, self.tournament.chips
+        p = self.current()
+        g.to_act.discard(p.id)
+        if action == "fold":
+            seat = g.turn % len(g.active)
+            g.active.remove(p)
+            g.turn = seat - 1  # the next player slid into this seat
+        else:
+            put = g.to_call(p.id) + (self.tournament.blind if action == "raise" else 0)
+            put = min(put, chips[p.id])
+            chips[p.id] -= put
+            g.contributions[p.id] += put
+            g.pot += put
+            if action == "raise":
+                g.to_act = {o.id for o in g.active if o is not p and chips[o.id]}
+        await self.advance()
+
+    async def advance(self, skip_first=True):
+        # Mirrors PokerView.next_turn, but a street only closes once every
+        # player with chips has acted since the last raise. Players who are
+        # all in, or who have no one left to bet against, check automatically.
+        g, chips = self.game, self.tournament.chips
+        while True:
+            if skip_first:
+                g.turn += 1
+            skip_first = True
+            if len(g.active) == 1:
+                return await self.showdown()
+            if not g.to_act:
+                g.deal_next()
+                if g.round >= 4:
+                    return await self.showdown()
+                g.to_act = {o.id for o in g.active if chips[o.id]}
+                g.turn = 0
+                skip_first = False
+                continue
+            p = self.current()
+            if p.id not in g.to_act:
+                continue
+            others = any(chips[o.id] for o in g.active if o is not p)
+            if others or g.to_call(p.id):
+                break
+            g.to_act.discard(p.id)
+        g.actions += 1
+        self.tournament.scheduler.call_later(self.tournament.action_seconds, self.expire, self.hand_no, g.actions)
+        await self.channel.send(embed=self.embed(), view=self.view)
+
+    async def expire(self, hand_no, actions):
+        g = self.game
+        if self.tournament.finished:
+            return  # a clock still on the heap after a cancel
+        if g and self.hand_no == hand_no and g.actions == actions:
+            p = self.current()
+            await self.act(p, "call" if not g.to_call(p.id) else "fold")
+
+    def embed(self):
+        g, t = self.game, self.tournament
+        p = self.current()
+        stacks = " | ".join(f"{o.mention} {t.chips[o.id]}" for o in g.active)
+        self._embed.description = (
+            f"🃏 Board: {g.board_text}\n"
+            f"💰 Pot: {g.pot} | Blind: {t.blind}\n"
+            f"🪙 {stacks}\n"
+            f"➡️ Turn: {p.mention} (to call {g.to_call(p.id)})"
+        )
+        return self._embed
+
+    async def showdown(self):
+        g, t = self.game, self.tournament
+        if len(g.active) == 1:
+            ranks = {g.active[0].id: 0}
+        else:
+            ranks = {p.id: hand_rank(g.hands[p.id] + g.board) for p in g.active}
+        won = split_pot(g.contributions, ranks)
+        for uid, amount in won.items():
+            t.chips[uid] += amount
+        self.game = None
+
+        lines = [f"🃏 Board: {' '.join(g.board) or '—'}"]
+        for p in g.active:
+            lines.append(f"{p.mention}: {' '.join(g.hands[p.id])} — won **{won[p.id]}**")
+        await self.channel.send(f"**Table {self.number}, hand {self.hand_no}**\n" + "\n".join(lines))
+        await t.hand_done(self, g)
+
+
+class TableView(View):
+    def __init__(self, table):
+        super().__init__(timeout=None)  # the shared scheduler runs the action clock
+        self.table = table
+
+    async def press(self, interaction, action):
+        error = self.table.check(interaction.user, action)
+        if error:
+            return await interaction.response.send_message(error, ephemeral=True)
+        await interaction.response.defer()
+        # The clock or another click may have moved the turn during defer().
+        error = await self.table.act(interaction.user, action)
+        if error:
+            await interaction.followup.send(error, ephemeral=True)
+
+    @discord.ui.button(label="Check / Call", style=discord.ButtonStyle.green)
+    async def call(self, interaction: discord.Interaction, _):
+        await self.press(interaction, "call")
+
+    @discord.ui.button(label="Raise", style=discord.ButtonStyle.blurple)
+    async def raise_bet(self, interaction: discord.Interaction, _):
+        await self.press(interaction, "raise")
+
+    @discord.ui.button(label="Fold", style=discord.ButtonStyle.red)
+    async def fold(self, interaction: discord.Interaction, _):
+        await self.press(interaction, "fold")
+
+# ------------------------------------------
+# ---------- TOURNAMENTS -------------------
+# ------------------------------------------
+
+class Tournament:
+    def __init__(self, guild_id, host, buyin, channel, scheduler=scheduler, table_size=TABLE_SIZE,
+                 level_seconds=LEVEL_SECONDS, action_seconds=ACTION_SECONDS, hand_pause=HAND_PAUSE):
+        self.guild_id = guild_id
+        self.host = host
+        self.buyin = buyin
+        self.channel = channel
+        self.scheduler = scheduler
+        self.table_size = table_size
+        self.level_seconds = level_seconds
+        self.action_seconds = action_seconds
+        self.hand_pause = hand_pause
+        self.players = {}  # uid -> user
+        self.chips = {}
+        self.tables = []
+        self.busted = []  # first out first
+        self.level = 0
+        self.hands = 0
+        self.started = False
+        self.finished = False
+
+    @property
+    def blind(self):
+        return BLINDS[min(self.level, len(BLINDS) - 1)]
+
+    @property
+    def remaining(self):
+        return len(self.players) - len(self.busted)
+
+    def register(self, user):
+        u = get_user(self.guild_id, user.id)
+        u["balance"] -= self.buyin
+        u["escrow"] = u.get("escrow", 0) + self.buyin
+        self.players[user.id] = user
+        self.chips[user.id] = STARTING_CHIPS
+
+    async def open_channel(self, number):
+        try:
+            return await self.channel.create_thread(name=f"Table {number}", type=discord.ChannelType.public_thread)
+        except (AttributeError, discord.HTTPException):
+            return self.channel  # not a text channel, or no thread permission
+
+    async def start(self):
+        self.started = True
+        players = list(self.players.values())
+        random.shuffle(players)
+        count = math.ceil(len(players) / self.table_size)
+        for n in range(count):
+            self.tables.append(TournamentTable(self, n + 1, await self.open_channel(n + 1)))
+        for i, p in enumerate(players):
+            self.tables[i % count].seats.append(p)
+
+        self.scheduler.call_later(self.level_seconds, self.level_up)
+        for table in self.tables:
+            table.schedule_hand(0)
+
+    def level_up(self):
+        if self.finished:
+            return
+        self.level += 1
+        self.scheduler.call_later(self.level_seconds, self.level_up)
+        if self.level < len(BLINDS):
+            return self.channel.send(f"⏫ Blinds are now **{self.blind}**.")
+
+    def rebalance(self, table):
+        # Runs when `table` is between hands, and only ever moves players off
+        # it: either the whole table breaks because the field fits in fewer
+        # tables, or it sheds players until it is at most one seat above the
+        # smallest table. Players joining a table mid-hand wait for the next.
+        others = [t for t in self.tables if t is not table]
+        if not others:
+            return []
+        if len(self.tables) > math.ceil(self.remaining / self.table_size):
+            self.tables.remove(table)
+            movers = table.seats
+            table.seats = []
+        else:
+            movers = []
+            while len(table.seats) - min(len(t.seats) for t in others) > 1:
+                movers.append(table.seats.pop())
+
+        moved = []
+        for p in movers:
+            target = min(others, key=lambda t: len(t.seats))
+            target.seats.append(p)
+            moved.append((p, target))
+            if target.game is None:
+                target.schedule_hand(self.hand_pause)
+        return moved
+
+    async def hand_done(self, table, game):
+        if self.finished:
+            return  # cancelled while the showdown was being posted; buy-ins are already refunded
+        self.hands += 1
+        out = sorted((p for p in game.players if not self.chips[p.id]), key=lambda p: game.stacks[p.id])
+        for p in out:
+            table.seats.remove(p)
+            self.busted.append(p)
+        if self.remaining == 1:
+            return await self.finish()
+
+        lines = [f"💀 {p.mention} is out in place **#{self.remaining + len(out) - i}**." for i, p in enumerate(out)]
+        for p, target in self.rebalance(table):
+            lines.append(f"🔀 {p.mention} moves to **Table {target.number}**.")
+        if lines:
+            await table.channel.send("\n".join(lines))
+        if table in self.tables:
+            table.schedule_hand(self.hand_pause)
+
+    def standings(self):
+        alive = sorted((p for p in self.players.values() if self.chips[p.id]), key=lambda p: -self.chips[p.id])
+        return alive + self.busted[::-1]
+
+    def pay_out(self):
+        # Settles every entrant against the escrowed pool in one save. The
+        # rounding remainder goes to the winner, so the pool is paid out in full.
+        gid = self.guild_id
+        places = self.standings()
+        pool = self.buyin * len(places)
+        prizes = [int(pool * share) for share in payout_shares(len(places))]
+        prizes[0] += pool - sum(prizes)
+        results = []
+        for i, p in enumerate(places):
+            paid = prizes[i] if i < len(prizes) else 0
+            u = get_user(gid, p.id)
+            u["escrow"] -= self.buyin
+            u["balance"] += paid
+            settle(gid, p.id, "tournament", self.buyin, paid)
+            results.append((p, paid))
+        save_data(gid)
+        return results
+
+    async def finish(self):
+        self.finished = True
+        for table in self.tables:
+            table.view.stop()
+        tournaments.pop(self.channel.id, None)
+        results = self.pay_out()
+        lines = [f"**#{i}** {p.mention} — 💰 **{paid}**" for i, (p, paid) in enumerate(results[:len(payout_shares(len(results)))], start=1)]
+        await self.channel.send(embed=discord.Embed(
+            title="🏆 Tournament Results",
+            description=f"{len(results)} players, {self.hands} hands, pool **{self.buyin * len(results)}**\n\n" + "\n".join(lines),
+            color=discord.Color.green()
+        ))
+
+    def cancel(self):
+        # Refunds every buy-in (unstarted timeout, extension unload).
+        self.finished = True
+        for table in self.tables:
+            table.view.stop()
+            table.game = None  # hands in play are void, their chips no longer matter
+        tournaments.pop(self.channel.id, None)
+        for uid in self.players:
+            u = get_user(self.guild_id, uid)
+            u["escrow"] -= self.buyin
+            u["balance"] += self.buyin
+        if self.players:
+            save_data(self.guild_id)
+
+    def expire_registration(self):
+        if not self.started and not self.finished:
+            self.cancel()
+            return self.channel.send("⌛ Tournament registration closed without a start, buy-ins refunded.")
+
+
+tournaments = {}  # channel id -> Tournament
+
+# ==========================================
+# ---------- REGISTRATION VIEW -------------
+# ==========================================
+
+class RegistrationView(View):
+    def __init__(self, tournament):
+        super().__init__(timeout=None)  # closed by the scheduler, see expire_registration
+        self.tournament = tournament
+
+    def content(self):
+        t = self.tournament
+        return (
+            f"🏆 **Poker Tournament** hosted by {t.host.mention}\n"
+            f"💰 Buy-in: **{t.buyin} dabloons** for {STARTING_CHIPS} chips\n"
+            f"🪑 {TABLE_SIZE} seats per table, blinds up every {t.level_seconds // 60} min\n"
+            f"👥 Registered: **{len(t.players)}**"
+        )
+
+    @discord.ui.button(label="Register", style=discord.ButtonStyle.green)
+    async def join(self, interaction: discord.Interaction, button: Button):
+        t = self.tournament
+        if t.started or t.finished:
+            return await interaction.response.send_message("Registration is closed.", ephemeral=True)
+        if interaction.user.id in t.players:
+            return await interaction.response.send_message("You're already registered.", ephemeral=True)
+        if get_user(interaction.guild_id, interaction.user.id)["balance"] < t.buyin:
+            return await interaction.response.send_message("Not enough balance for the buy-in.", ephemeral=True)
+
+        t.register(interaction.user)
+        save_data(interaction.guild_id)
+        await interaction.response.edit_message(content=self.content(), view=self)
+
+    @discord.ui.button(label="Start", style=discord.ButtonStyle.blurple)
+    async def begin(self, interaction: discord.Interaction, button: Button):
+        t = self.tournament
+        if interaction.user.id != t.host.id:
+            return await interaction.response.send_message("Only the host can start the tournament.", ephemeral=True)
+        if t.started or t.finished:
+            return await interaction.response.send_message("Already started.", ephemeral=True)
+        if len(t.players) < MIN_PLAYERS:
+            return await interaction.response.send_message(f"Need at least {MIN_PLAYERS} players.", ephemeral=True)
+
+        self.stop()
+        await interaction.response.edit_message(content=self.content() + "\n\n🚦 **Shuffle up and deal!**", view=None)
+        await t.start()
+
+# ==========================================
+# ---------- SLASH COMMANDS ----------------
+# ==========================================
+
+@app_commands.command(name="tourney")
+@app_commands.guild_only()
+@app_commands.describe(buyin="Dabloons per entrant, paid out to the top finishers")
+async def tourney(interaction: discord.Interaction, buyin: int):
+    if buyin <= 0:
+        return await interaction.response.send_message("Buy-in must be positive.", ephemeral=True)
+    if interaction.channel_id in tournaments:
+        return await interaction.response.send_message("A tournament is already running in this channel.", ephemeral=True)
+
+    t = Tournament(interaction.guild_id, interaction.user, buyin, interaction.channel)
+    tournaments[interaction.channel_id] = t
+    scheduler.call_later(REGISTRATION_SECONDS, t.expire_registration)
+    view = RegistrationView(t)
+    await interaction.response.send_message(view.content(), view=view)
+
+
+async def setup(bot):
+    bot.tree.add_command(tourney)
+
+
+async def teardown(bot):
+    for t in list(tournaments.values()):
+        t.cancel()
+        await t.channel.send("⚠️ Tournament cancelled, buy-ins refunded.")
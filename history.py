@@ -0,0 +1,258 @@
+import os
+import json
+import mmap
+import time
+from array import array
+
+import games
+from economy import atomic_write
+
+# ==========================================
+# ---------- TRANSACTION ARCHIVE -----------
+# ==========================================
+# Append-only columnar log of every settlement, one archive per guild:
+#
+#   history/<guild>/chunk-00000.ts      float64  unix timestamp
+#                   chunk-00000.user    int64    user id
+#                   chunk-00000.game    uint8    GameSpec.code, or KINDS for non-games
+#                   chunk-00000.stake   int64    dabloons put in
+#                   chunk-00000.payout  int64    dabloons paid back
+#                   chunk-00000.peer    int64    counterparty user id (0 = house)
+#                   chunk-00000.prev    int64    previous row of the same user (-1 = none)
+#                   heads.json                   user id -> newest row
+#
+# Each column is a flat array file, CHUNK_ROWS rows per chunk. The "prev"
+# column chains a user's rows newest-to-oldest, so a page of someone's
+# history is a walk from heads.json through mmapped columns and never
+# touches anyone else's rows.
+#
+# Rows are written by the guild's economy partition as part of its deferred
+# flush, on the same worker thread as the balances. heads.json is only a
+# checkpoint: it is rewritten every HEADS_EVERY rows and on shutdown, and
+# _recover() re-indexes whatever was appended after it.
+
+CHUNK_ROWS = 1 << 16
+HEADS_EVERY = 4096
+HISTORY_DIR = "history"
+
+# Codes of settlements that are not games; every game carries its own on
+# its GameSpec. Both share the game column, so a code is never changed or
+# reused.
+KINDS = {"tip": 5, "claim": 6, "giveaway": 7, "admin": 8}
+
+_codes = {}  # kind -> code, rebuilt when a game is registered
+_names = {}  # code -> kind
+
+
+def _index():
+    codes = dict(KINDS)
+    for spec in games.GAMES.values():
+        clash = next((k for k, c in KINDS.items() if c == spec.code), None)
+        if clash:
+            raise ValueError(f"archive code {spec.code} of game {spec.name!r} is taken by {clash!r}")
+        codes[spec.name] = spec.code
+    _codes.clear()
+    _codes.update(codes)
+    _names.clear()
+    _names.update((c, k) for k, c in codes.items())
+
+
+def kind_code(kind):
+    if len(_codes) != len(KINDS) + len(games.GAMES):
+        _index()
+    return _codes[kind]
+
+
+def kind_name(code):
+    if len(_codes) != len(KINDS) + len(games.GAMES):
+        _index()
+    return _names.get(code, f"#{code}")  # a game that is no longer registered
+
+COLUMNS = {
+    "ts": "d",
+    "user": "q",
+    "game": "B",
+    "stake": "q",
+    "payout": "q",
+    "peer": "q",
+    "prev": "q",
+}
+
+
+class HistoryArchive:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.heads_path = os.path.join(path, "heads.json")
+        self.pending = {col: array(code) for col, code in COLUMNS.items()}
+        self.flushing = None  # rows handed to a writer, readable until end_flush()
+        self._maps = {}  # (chunk, column) -> mmapped view
+        self.rows = 0
+        self._recover()
+
+    def _file(self, chunk, col):
+        return os.path.join(self.path, f"chunk-{chunk:05d}.{col}")
+
+    def _chunk_rows(self, chunk):
+        sizes = []
+        for col, code in COLUMNS.items():
+            f = self._file(chunk, col)
+            sizes.append(os.path.getsize(f) // array(code).itemsize if os.path.exists(f) else 0)
+        return min(sizes), sizes
+
+    def _recover(self):
+        # Rows = shortest column of the last chunk; anything longer is a torn
+        # append from a crash and is cut back.
+        chunk = 0
+        while os.path.exists(self._file(chunk + 1, "ts")):
+            chunk += 1
+        rows, sizes = self._chunk_rows(chunk)
+        if len(set(sizes)) > 1:
+            for col, code in COLUMNS.items():
+                f = self._file(chunk, col)
+                if os.path.exists(f):
+                    os.truncate(f, rows * array(code).itemsize)
+        self.rows = total = chunk * CHUNK_ROWS + rows
+
+        heads, indexed = {}, 0
+        if os.path.exists(self.heads_path):
+            with open(self.heads_path, "r") as f:
+                saved = json.load(f)
+            if saved["rows"] <= total:
+                heads, indexed = saved["heads"], saved["rows"]
+        self.heads = {int(uid): row for uid, row in heads.items()}
+        self.heads_rows = indexed
+        # Re-index only the tail written after heads.json was last saved.
+        for row in range(indexed, total):
+            self.heads[self.read(row, "user")] = row
+
+    def append(self, uid, game, stake, payout, peer=None, ts=None):
+        uid = int(uid)
+        code = kind_code(game)  # before touching the columns, so an unknown kind leaves them aligned
+        row = self.rows + len(self.pending["ts"])
+        if self.flushing is not None:
+            row += len(self.flushing["ts"])
+        self.pending["ts"].append(ts or time.time())
+        self.pending["user"].append(uid)
+        self.pending["game"].append(code)
+        self.pending["stake"].append(stake)
+        self.pending["payout"].append(payout)
+        self.pending["peer"].append(int(peer) if peer else 0)
+        self.pending["prev"].append(self.heads.get(uid, -1))
+        self.heads[uid] = row
+
+    def begin_flush(self, checkpoint=False):
+        # Event loop side: hand the pending rows to a writer. Returns the
+        # arguments for write(), or None when there is nothing to do.
+        if self.flushing is not None:
+            return None
+        n = len(self.pending["ts"])
+        total = self.rows + n
+        heads = None
+        if total - self.heads_rows >= HEADS_EVERY or (checkpoint and total != self.heads_rows):
+            heads = dict(self.heads)
+            self.heads_rows = total
+        if not n and heads is None:
+            return None
+        self.flushing = self.pending
+        self.pending = {col: array(code) for col, code in COLUMNS.items()}
+        return self.rows, self.flushing, heads
+
+    def write(self, start, batch, heads=None):
+        # Safe on a worker thread: touches only the files. Rows go to fixed
+        # offsets, so writing a batch again after an interrupted flush is
+        # harmless.
+        n = len(batch["ts"])
+        done = 0
+        while done < n:
+            chunk, offset = divmod(start + done, CHUNK_ROWS)
+            take = min(CHUNK_ROWS - offset, n - done)
+            for col, code in COLUMNS.items():
+                path = self._file(chunk, col)
+                with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                    f.seek(offset * array(code).itemsize)
+                    batch[col][done:done + take].tofile(f)
+            done += take
+        if heads is not None:
+            atomic_write(self.heads_path, json.dumps({"rows": start + n, "heads": heads}))
+
+    def end_flush(self):
+        self.rows += len(self.flushing["ts"])
+        self.flushing = None
+
+    def abort_flush(self):
+        # The write failed or was cut off: its rows go back in front of the
+        # pending ones and are written again (same offsets) next time.
+        for col in COLUMNS:
+            self.flushing[col].extend(self.pending[col])
+        self.pending, self.flushing = self.flushing, None
+
+    def flush(self):
+        # Synchronous flush for shutdown and scripts; also checkpoints heads.
+        if self.flushing is not None:
+            self.abort_flush()  # a threaded flush was cut off (the loop is gone)
+        job = self.begin_flush(checkpoint=True)
+        if job:
+            self.write(*job)
+            self.end_flush()
+
+    def _column(self, chunk, col, offset):
+        view = self._maps.get((chunk, col))
+        if view is None or offset >= len(view):
+            # The live chunk keeps growing; remap it once a read goes past
+            # the end of the current mapping.
+            with open(self._file(chunk, col), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = self._maps[(chunk, col)] = memoryview(mm).cast(COLUMNS[col])
+        return view
+
+    def read(self, row, col):
+        if row >= self.rows:
+            row -= self.rows
+            if self.flushing is not None:
+                if row < len(self.flushing["ts"]):
+                    return self.flushing[col][row]
+                row -= len(self.flushing["ts"])
+            return self.pending[col][row]
+        chunk, offset = divmod(row, CHUNK_ROWS)
+        return self._column(chunk, col, offset)[offset]
+
+    def user_rows(self, uid, skip=0, limit=10):
+        row = self.heads.get(int(uid), -1)
+        while row >= 0 and skip:
+            row = self.read(row, "prev")
+            skip -= 1
+        rows = []
+        while row >= 0 and len(rows) < limit:
+            rows.append(row)
+            row = self.read(row, "prev")
+        return rows
+
+    def entries(self, uid, skip=0, limit=10):
+        out = []
+        for row in self.user_rows(uid, skip, limit):
+            out.append({
+                "ts": self.read(row, "ts"),
+                "game": kind_name(self.read(row, "game")),
+                "stake": self.read(row, "stake"),
+                "payout": self.read(row, "payout"),
+                "peer": self.read(row, "peer") or None,
+            })
+        return out
+
+
+class HistoryRegistry:
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+        self.archives = {}
+        _index()  # a clashing archive code fails at startup, not on a settlement
+
+    def __call__(self, guild_id):
+        archive = self.archives.get(guild_id)
+        if archive is None:
+            archive = self.archives[guild_id] = HistoryArchive(os.path.join(self.root, str(guild_id)))
+        return archive
+
+    def flush_all(self):
+        for archive in self.archives.values():
+            archive.flush()
@@ -0,0 +1,63 @@
+import os
+from dotenv import load_dotenv
+
+from audit import Auditor
+from economy import EconomyRegistry, DATA_DIR
+from replication import ReplicationLeader
+from history import HistoryRegistry
+import games
+
+# ==========================================
+# ---------- LEDGER CONFIGURATION ----------
+# ==========================================
+# Shared by bot.py and every game module, so it lives outside bot.py.
+
+load_dotenv()
+
+# Per-guild settings (start balance, limbo cap, claims) live in
+# guilds/<id>.config.json, see economy.DEFAULT_CONFIG.
+DATA_FILE = "dabloon_data.json"  # pre-sharding data, migrated into LEGACY_GUILD_ID
+AUDIT_FILE = "audit_data.json"
+LEGACY_GUILD_ID = int(os.getenv("LEGACY_GUILD_ID", "1332118870181412936"))
+DATA_DIR = os.getenv("DATA_DIR", DATA_DIR)  # point at a promoted follower's directory on failover
+
+# Hot-standby replication: when set, committed saves are streamed to
+# follower processes (python replication.py --port <port>).
+REPLICATION_PORT = os.getenv("REPLICATION_PORT")
+
+# ==========================================
+# ---------- DATA CORE FUNCTIONS -----------
+# ==========================================
+
+# Archive rows are written by the owning economy partition's flush.
+history = HistoryRegistry()
+economy = EconomyRegistry(DATA_DIR, LEGACY_GUILD_ID, DATA_FILE, history=history)
+replication = None
+if REPLICATION_PORT:
+    replication = ReplicationLeader(economy, port=int(REPLICATION_PORT))
+    economy.on_commit = replication.publish
+auditor = Auditor(AUDIT_FILE)
+
+def get_user(guild_id, uid, save=True):
+    return economy(guild_id).get_user(uid, save)
+
+def save_data(guild_id):
+    economy(guild_id).save()
+
+def guild_config(guild_id):
+    return economy(guild_id).config
+
+def settle(guild_id, uid, game, stake, paid, peer=None):
+    # stake = dabloons put in, paid = dabloons handed back (stake included).
+    # Every settlement is archived; wagers on registered games also update
+    # the user's stats and the RTP audit.
+    history(guild_id).append(uid, game, stake, paid, peer)
+    if game not in games.GAMES:
+        return
+    games.record(get_user(guild_id, uid), game, stake, paid)
+    if auditor.record(game, stake, paid):
+        a = auditor.games[game]
+        print(f"[audit] {game} RTP {a.rtp:.2%} is out of bounds (expected {a.expected:.2%}, z={a.zscore():+.1f})")
+
+def total_wl(u):
+    return u["total"]["wins"], u["total"]["losses"]
@@ -0,0 +1,144 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+# ==========================================
+# ---------- ON-DEMAND PROFILING -----------
+# ==========================================
+# Nothing in here runs until a session is started, so an idle bot pays
+# nothing for having the module around.
+
+PROFILE_MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL = 0.005
+TRACEMALLOC_FRAMES = 10
+
+
+# Polls the target thread's stack from a background thread.
+class Sampler:
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            self.samples += 1
+            self.self_counts[stack[0]] += 1
+            for key in set(stack):
+                self.total_counts[key] += 1
+            self.stacks[";".join(f"{name} ({os.path.basename(fn)}:{ln})" for fn, ln, name in reversed(stack))] += 1
+
+    def dump(self, path):
+        # Collapsed-stack format, loadable by flamegraph.pl / speedscope.
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top(self, limit):
+        rows = []
+        for (fn, ln, name), count in self.self_counts.most_common(limit):
+            share = count / self.samples if self.samples else 0
+            rows.append((f"{os.path.basename(fn)}:{ln}({name})", share, self.total_counts[(fn, ln, name)] / self.samples))
+        return rows
+
+
+class ProfileSession:
+    def __init__(self, mode, duration, out_dir):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"unknown profile mode: {mode}")
+        self.mode = mode
+        self.duration = duration
+        self.out_dir = out_dir
+        self.stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        self.profiler = None
+        self.sampler = None
+        self.started_at = None
+        self.elapsed = 0.0
+        self._snapshot = None
+        self._owns_tracemalloc = False
+        self.files = []
+
+    def start(self):
+        # Must be called from the thread we want to profile (the event loop).
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._owns_tracemalloc = True
+        self._snapshot = tracemalloc.take_snapshot()
+
+        if self.mode == "cprofile":
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.sampler = Sampler(threading.get_ident())
+            self.sampler.start()
+        self.started_at = time.perf_counter()
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.started_at
+        if self.profiler:
+            self.profiler.disable()
+        if self.sampler:
+            self.sampler.stop()
+
+        after = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"{self.stamp}-{self.mode}")
+
+        if self.profiler:
+            self.profiler.dump_stats(base + ".pstats")
+            self.files.append(base + ".pstats")
+        else:
+            self.sampler.dump(base + ".stacks")
+            self.files.append(base + ".stacks")
+
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diff = after.filter_traces(filters).compare_to(self._snapshot.filter_traces(filters), "lineno")
+        with open(base + ".alloc.txt", "w") as f:
+            for stat in diff[:100]:
+                f.write(f"{stat}\n")
+        after.dump(base + ".alloc.snapshot")
+        self.files += [base + ".alloc.txt", base + ".alloc.snapshot"]
+        self._snapshot = None
+        return diff
+
+    def top_functions(self, limit=10):
+        if self.profiler:
+            stats = pstats.Stats(self.profiler)
+            rows = []
+            for (fn, ln, name), (cc, nc, tt, ct, callers) in stats.stats.items():
+                rows.append((f"{os.path.basename(fn)}:{ln}({name})", tt, ct, nc))
+            rows.sort(key=lambda r: r[1], reverse=True)
+            return [f"`{r[0]}` — self {r[1]*1000:.1f}ms, cum {r[2]*1000:.1f}ms, {r[3]} calls" for r in rows[:limit]]
+        return [
+            f"`{label}` — self {share:.1%}, cum {cum:.1%}"
+            for label, share, cum in self.sampler.top(limit)
+        ]
@@ -0,0 +1,260 @@
+import sys
+import json
+import time
+import signal
+import asyncio
+import argparse
+from collections import deque
+
+from economy import EconomyRegistry
+
+# ==========================================
+# ---------- LEDGER REPLICATION ------------
+# ==========================================
+# The bot (leader) streams every committed save as newline-delimited JSON
+# over a local TCP socket. A follower process applies the records to its own
+# partitions and acks each one once it is on the follower's disk, which is
+# how the leader measures lag.
+#
+#   leader   -> {"type": "snapshot", "guild": id, "users": {...}, "config": {...}}
+#   leader   -> {"type": "commit", "seq": n, "ts": t, "guild": id, "users": {...}}
+#   follower -> {"ack": n, "ts": t}
+#
+# A follower gets a full snapshot every time it (re)connects, so the leader
+# keeps no backlog; a follower that falls too far behind is dropped and
+# resyncs on its next connection.
+
+MAX_FOLLOWER_BACKLOG = 10000
+RATE_WINDOW = 60  # seconds of per-second buckets kept for throughput
+RECONNECT_DELAY = 2.0
+REPORT_SECONDS = 10
+
+
+class RateMeter:
+    def __init__(self, window=RATE_WINDOW):
+        self.buckets = deque(maxlen=window)  # [second, entries, bytes]
+
+    def add(self, nbytes):
+        now = int(time.time())
+        if not self.buckets or self.buckets[-1][0] != now:
+            self.buckets.append([now, 0, 0])
+        self.buckets[-1][1] += 1
+        self.buckets[-1][2] += nbytes
+
+    def rate(self):
+        cutoff = int(time.time()) - self.buckets.maxlen
+        live = [b for b in self.buckets if b[0] > cutoff]
+        if not live:
+            return 0.0, 0.0
+        span = max(time.time() - live[0][0], 1.0)
+        return sum(b[1] for b in live) / span, sum(b[2] for b in live) / span
+
+
+class FollowerLink:
+    def __init__(self, writer):
+        self.writer = writer
+        self.peer = writer.get_extra_info("peername")
+        self.queue = asyncio.Queue()
+        self.acked_seq = 0
+        self.lag_ms = 0.0
+
+
+class ReplicationLeader:
+    def __init__(self, economy, host="127.0.0.1", port=8765):
+        self.economy = economy
+        self.host = host
+        self.port = port
+        self.seq = 0
+        self.followers = set()
+        self.meter = RateMeter()
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    def publish(self, guild_id, users):
+        # Called from Economy.save(); serialise now, the dicts keep mutating.
+        self.seq += 1
+        if not self.followers:
+            return
+        line = json.dumps({"type": "commit", "seq": self.seq, "ts": time.time(), "guild": guild_id, "users": users}) + "\n"
+        self.meter.add(len(line))
+        for link in list(self.followers):
+            if link.queue.qsize() > MAX_FOLLOWER_BACKLOG:
+                self._drop(link)
+            else:
+                link.queue.put_nowait(line)
+
+    def _drop(self, link):
+        self.followers.discard(link)
+        link.writer.close()
+
+    async def _handle(self, reader, writer):
+        link = FollowerLink(writer)
+        # Snapshot and registration happen without yielding, so no commit
+        # can slip in between them.
+        for gid in self.economy.guild_ids():
+            eco = self.economy(gid)
+            link.queue.put_nowait(json.dumps({"type": "snapshot", "guild": gid, "users": eco.users, "config": eco.config}) + "\n")
+        link.acked_seq = self.seq
+        self.followers.add(link)
+        print(f"[replication] follower connected from {link.peer}")
+
+        sender = asyncio.create_task(self._send(link))
+        try:
+            while line := await reader.readline():
+                ack = json.loads(line)
+                link.acked_seq = ack["ack"]
+                link.lag_ms = (time.time() - ack["ts"]) * 1000
+        except (ConnectionError, json.JSONDecodeError):
+            pass
+        finally:
+            sender.cancel()
+            self._drop(link)
+            print(f"[replication] follower {link.peer} disconnected")
+
+    async def _send(self, link):
+        try:
+            while True:
+                link.writer.write((await link.queue.get()).encode())
+                await link.writer.drain()
+        except ConnectionError:
+            self._drop(link)
+
+    def report(self):
+        entries, nbytes = self.meter.rate()
+        lines = [f"seq **{self.seq}** | {entries:.1f} commits/s | {nbytes / 1024:.1f} KiB/s"]
+        for link in self.followers:
+            lines.append(
+                f"↳ {link.peer[0]}:{link.peer[1]} — persisted {link.acked_seq} "
+                f"({self.seq - link.acked_seq} behind, {link.lag_ms:.1f}ms to disk)"
+            )
+        if not self.followers:
+            lines.append("⚠️ no followers connected")
+        return lines
+
+
+class ReplicationFollower:
+    def __init__(self, economy, host="127.0.0.1", port=8765):
+        self.economy = economy
+        self.host = host
+        self.port = port
+        # Applied: in the follower's memory. Persisted: written to its disk and
+        # acked; only persisted commits survive a follower crash.
+        self.applied_seq = 0
+        self.persisted_seq = 0
+        self.lag_ms = 0.0
+        self.persisted_lag_ms = 0.0
+        self.meter = RateMeter()
+        self.promoted = False
+
+    async def run(self):
+        reporter = asyncio.create_task(self._report())
+        try:
+            while not self.promoted:
+                try:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                except OSError:
+                    await asyncio.sleep(RECONNECT_DELAY)
+                    continue
+                print(f"[follower] connected to {self.host}:{self.port}")
+                try:
+                    await self._follow(reader, writer)
+                except ConnectionError:
+                    pass
+                writer.close()
+                print(f"[follower] leader gone at seq {self.applied_seq}")
+        finally:
+            reporter.cancel()
+            await self.economy.drain_all()
+            if self.promoted:
+                print(f"[follower] promoted at seq {self.applied_seq}, start the bot with DATA_DIR={self.economy.data_dir}")
+
+    async def _follow(self, reader, writer):
+        acks = asyncio.Queue()
+        acker = asyncio.create_task(self._ack(writer, acks))
+        try:
+            await self._apply(reader, acks)
+        finally:
+            acker.cancel()
+
+    async def _apply(self, reader, acks):
+        while not self.promoted and (line := await reader.readline()):
+            msg = json.loads(line)
+            eco = self.economy(msg["guild"])
+            if msg["type"] == "snapshot":
+                eco.users = msg["users"]
+                if msg["config"] != eco.config:
+                    eco.config = msg["config"]
+                    eco.write_config()
+                eco.save()
+                continue
+
+            eco.users.update(msg["users"])
+            eco.save()
+            self.applied_seq = msg["seq"]
+            self.lag_ms = (time.time() - msg["ts"]) * 1000
+            self.meter.add(len(line))
+            acks.put_nowait((msg["seq"], msg["ts"], eco, eco.version))
+
+    async def _ack(self, writer, acks):
+        # Commits are acked in order, each once the partition write covering
+        # it has finished; one coalesced write usually releases a whole run.
+        try:
+            while True:
+                seq, ts, eco, version = await acks.get()
+                await eco.wait_written(version)
+                self.persisted_seq = seq
+                self.persisted_lag_ms = (time.time() - ts) * 1000
+                writer.write((json.dumps({"ack": seq, "ts": ts}) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(REPORT_SECONDS)
+            entries, nbytes = self.meter.rate()
+            print(
+                f"[follower] applied {self.applied_seq} ({self.lag_ms:.1f}ms lag) | "
+                f"persisted {self.persisted_seq} ({self.persisted_lag_ms:.1f}ms lag) | "
+                f"{entries:.1f} commits/s | {nbytes / 1024:.1f} KiB/s"
+            )
+
+    def promote(self):
+        # Stop following; run() then drains every partition to disk and the
+        # data dir can be served by the bot (DATA_DIR=<follower dir>) as the
+        # new leader. Cancel the run() task to stop it promptly.
+        self.promoted = True
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Hot-standby follower for the dabloon ledger.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", default="replica")
+    args = parser.parse_args()
+
+    follower = ReplicationFollower(EconomyRegistry(args.data_dir), args.host, args.port)
+    task = asyncio.create_task(follower.run())
+    loop = asyncio.get_running_loop()
+
+    def promote():
+        follower.promote()
+        task.cancel()
+
+    # SIGUSR1 promotes, SIGINT/SIGTERM just flush and exit.
+    if sys.platform != "win32":
+        loop.add_signal_handler(signal.SIGUSR1, promote)
+        loop.add_signal_handler(signal.SIGTERM, task.cancel)
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+# ==========================================
+# ---------- TOURNAMENT SIMULATION ---------
+# ==========================================
+# Runs a full tournament with bot players on one event loop and reports
+# throughput, event loop lag and how many tasks were alive, to check that
+# dozens of tables share the scheduler instead of each polling on its own.
+# Channels and players are stubs; the ledger is real but lives in a
+# throwaway DATA_DIR.
+#
+#   python tournament_sim.py --players 400 --table-size 9
+
+class BotPlayer:
+    def __init__(self, uid):
+        self.id = uid
+        self.mention = f"<@{uid}>"
+
+
+class StubChannel:
+    def __init__(self, sim, cid):
+        self.sim = sim
+        self.id = cid
+
+    async def create_thread(self, name, type=None):
+        self.sim.threads += 1
+        return StubChannel(self.sim, self.id * 1000 + self.sim.threads)
+
+    async def send(self, content=None, embed=None, view=None):
+        self.sim.messages += 1
+        table = getattr(view, "table", None)
+        if table is not None and table.game:
+            self.sim.think(table)
+
+
+class Simulation:
+    def __init__(self, tm, args):
+        self.tm = tm
+        self.args = args
+        self.messages = 0
+        self.threads = 0
+        self.actions = 0
+        self.timeouts = 0
+        self.lag = []
+        self.max_tasks = 0
+        self.max_live_tables = 0
+        self._moves = set()
+
+    def think(self, table):
+        # Bots answer their turn after a short think time; a few go AFK and
+        # leave it to the tournament's action clock.
+        if random.random() < self.args.afk:
+            self.timeouts += 1
+            return
+        loop = asyncio.get_running_loop()
+        loop.call_later(random.uniform(0, self.args.think), self.move, table, table.hand_no, table.game.actions)
+
+    def move(self, table, hand_no, actions):
+        if not table.game or table.hand_no != hand_no or table.game.actions != actions:
+            return
+        r = random.random()
+        action = "fold" if r < 0.15 and table.game.to_call(table.current().id) else "raise" if r < 0.3 else "call"
+        if table.check(table.current(), action):
+            action = "call"
+        self.actions += 1
+        task = asyncio.get_running_loop().create_task(table.act(table.current(), action))
+        self._moves.add(task)
+        task.add_done_callback(self._moves.discard)
+
+    async def probe(self, t, interval=0.01):
+        # Event loop lag: how late a 10ms sleep wakes up.
+        while not t.finished:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.lag.append(time.perf_counter() - start - interval)
+            self.max_tasks = max(self.max_tasks, len(asyncio.all_tasks()))
+            self.max_live_tables = max(self.max_live_tables, sum(1 for tb in t.tables if tb.game))
+
+    async def run(self):
+        tm, args = self.tm, self.args
+        from ledger import economy, get_user
+        gid = 1
+        players = [BotPlayer(10**17 + i) for i in range(args.players)]
+        before = sum(get_user(gid, p.id)["balance"] for p in players)
+
+        t = tm.Tournament(gid, players[0], args.buyin, StubChannel(self, 1), table_size=args.table_size,
+                          level_seconds=args.level_seconds, action_seconds=args.action_seconds, hand_pause=0)
+        tm.tournaments[1] = t
+        for p in players:
+            t.register(p)
+
+        start = time.perf_counter()
+        await t.start()
+        tables = len(t.tables)
+        await self.probe(t)
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0)
+
+        users = economy(gid).users
+        after = sum(users[str(p.id)]["balance"] for p in players)
+        escrow = sum(users[str(p.id)].get("escrow", 0) for p in players)
+        lag = sorted(self.lag) or [0.0]
+        pct = lambda q: lag[min(len(lag) - 1, int(q * len(lag)))] * 1000
+
+        print(f"players          {args.players} on {tables} tables of {args.table_size}")
+        print(f"hands            {t.hands} ({t.hands / elapsed:.0f}/s), blind level {t.level} ({t.blind})")
+        print(f"bot actions      {self.actions} ({self.actions / elapsed:.0f}/s), {self.timeouts} left to the action clock")
+        print(f"messages         {self.messages}, {self.threads} table threads")
+        print(f"elapsed          {elapsed:.2f}s")
+        print(f"loop lag         p50 {pct(0.5):.2f}ms  p99 {pct(0.99):.2f}ms  max {lag[-1] * 1000:.2f}ms")
+        print(f"peak tables live {self.max_live_tables}, peak tasks {self.max_tasks}, timers fired {tm.scheduler.fired}")
+        print(f"ledger           {before} before, {after} after, {escrow} left in escrow")
+        if before != after or escrow:
+            raise SystemExit("ledger not conserved")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a poker tournament with bot players")
+    parser.add_argument("--players", type=int, default=300)
+    parser.add_argument("--table-size", type=int, default=6)
+    parser.add_argument("--buyin", type=int, default=100)
+    parser.add_argument("--level-seconds", type=float, default=1.0)
+    parser.add_argument("--action-seconds", type=float, default=0.5)
+    parser.add_argument("--think", type=float, default=0.005, help="max bot think time in seconds")
+    parser.add_argument("--afk", type=float, default=0.01, help="chance a bot ignores its turn")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    # The ledger reads DATA_DIR at import, so point it at a scratch directory first.
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    scratch = tempfile.mkdtemp(prefix="tournament-sim-")
+    os.environ["DATA_DIR"] = os.path.join(scratch, "guilds")
+    os.chdir(scratch)
+    from games import tournament
+
+    asyncio.run(Simulation(tournament, args).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,547 @@
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import zlib
+import random
+import shutil
+import asyncio
+import argparse
+import tempfile
+from collections import Counter
+
+import discord
+
+# ==========================================
+# ---------- INTERACTION TRACES ------------
+# ==========================================
+# Recording is opt-in (TRACE_FILE in bot.py). Every slash command and button
+# click is written to a gzipped NDJSON trace:
+#
+#   {"v": 1, "start": <unix time>}                 one header per bot session
+#   [ms, kind, guild, channel, user, admin, name, payload]
+#
+# kind "c" is a slash command (name = command, payload = options), kind "b" a
+# button press (name = button label, payload = message). Every Discord ID,
+# including mentions inside string options, is replaced by a sequential
+# stand-in, so a trace holds no real IDs and no message content. Stand-ins
+# are only kept per session (the real ones are never written anywhere), so
+# the reader moves each session's into its own range of SESSION_SPAN IDs.
+#
+# Replaying (python tracing.py replay <trace>) imports bot.py against a
+# scratch ledger, feeds the events to the same handlers through stub Discord
+# objects and reports throughput, response latency and the ledger it ends with.
+
+TRACE_VERSION = 1
+ANON_BASE = 10**17  # stand-ins still look like snowflakes (mention parsing wants 15+ digits)
+SESSION_SPAN = 10**11  # stand-ins per session once read back
+FLUSH_EVERY = 200  # events between forced flushes
+FLUSH_SECONDS = 5
+
+ID_RE = re.compile(r"\d{15,21}")  # snowflakes, bare or inside <@...>, <@&...>, <#...>
+OPTION_KINDS = {6: "u", 7: "ch", 8: "r", 9: "u", 11: "a"}  # Discord option types that carry IDs
+
+
+class TraceRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.ids = {}  # real id -> stand-in, per session
+        self.events = 0
+        self.start = time.monotonic()
+        self.last_flush = self.start
+        self.file = gzip.open(path, "at", encoding="utf-8")
+        self.file.write(json.dumps({"v": TRACE_VERSION, "start": time.time()}) + "\n")
+
+    def anon(self, real):
+        if not real:
+            return 0
+        real = int(real)
+        if real not in self.ids:
+            self.ids[real] = ANON_BASE + len(self.ids) + 1
+        return self.ids[real]
+
+    def scrub(self, text):
+        return ID_RE.sub(lambda m: str(self.anon(m.group())), text)
+
+    def options(self, data):
+        out = {}
+        for opt in data.get("options", []):
+            value = opt.get("value")
+            kind = OPTION_KINDS.get(opt.get("type"))
+            if kind == "a":
+                value = {"a": 1}  # attachments are never recorded
+            elif kind:
+                value = {kind: self.anon(value)}
+            elif isinstance(value, str):
+                value = self.scrub(value)
+            out[opt["name"]] = value
+        return out
+
+    @staticmethod
+    def label(message, custom_id):
+        for row in getattr(message, "components", []):
+            for child in getattr(row, "children", [row]):
+                if getattr(child, "custom_id", None) == custom_id:
+                    return child.label
+        return None
+
+    def record(self, interaction):
+        data = interaction.data or {}
+        if interaction.type == discord.InteractionType.application_command:
+            kind, name, payload = "c", data.get("name"), self.options(data)
+        elif interaction.type == discord.InteractionType.component:
+            kind, name = "b", self.label(interaction.message, data.get("custom_id"))
+            payload = self.anon(interaction.message.id) if interaction.message else 0
+        else:
+            return
+
+        perms = getattr(interaction.user, "guild_permissions", None)
+        now = time.monotonic()
+        event = [
+            round((now - self.start) * 1000), kind,
+            self.anon(interaction.guild_id), self.anon(interaction.channel_id), self.anon(interaction.user.id),
+            1 if perms and perms.administrator else 0, name, payload,
+        ]
+        self.file.write(json.dumps(event, separators=(",", ":"), ensure_ascii=False) + "\n")
+        self.events += 1
+        if self.events % FLUSH_EVERY == 0 or now - self.last_flush > FLUSH_SECONDS:
+            self.file.flush()
+            self.last_flush = now
+
+    def close(self):
+        self.file.close()
+
+
+def namespace(row, offset):
+    # Moves every stand-in in an event up by offset; 0 (no ID) stays 0.
+    if not offset:
+        return row
+    bump = lambda i: i + offset if i else 0
+    ms, kind, gid, cid, uid, admin, name, payload = row
+    if kind == "b":
+        payload = bump(payload)
+    else:
+        out = {}
+        for key, value in payload.items():
+            if isinstance(value, dict):
+                value = {k: (v if k == "a" else bump(v)) for k, v in value.items()}
+            elif isinstance(value, str):
+                value = ID_RE.sub(lambda m: str(int(m.group()) + offset), value)
+            out[key] = value
+        payload = out
+    return [ms, kind, bump(gid), bump(cid), bump(uid), admin, name, payload]
+
+
+def read_trace(path, max_gap):
+    # Yields (seconds, event) with sessions laid end to end and idle gaps
+    # longer than max_gap squeezed down to it. A torn tail (crash mid-write)
+    # ends the trace instead of failing it.
+    events = []
+    start = None
+    session = -1
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    break
+                if isinstance(row, dict):
+                    start = row["start"]
+                    session += 1
+                elif start is not None:
+                    events.append((start + row[0] / 1000, namespace(row, session * SESSION_SPAN)))
+    except (EOFError, OSError, zlib.error):
+        pass
+
+    out, clock, prev = [], 0.0, None
+    for t, row in events:
+        if prev is not None:
+            clock += min(max(t - prev, 0.0), max_gap)
+        prev = t
+        out.append((clock, row))
+    return out
+
+# ==========================================
+# ---------- REPLAY STUBS ------------------
+# ==========================================
+# Just enough of discord.py's Interaction/User/Channel/Message surface for
+# the handlers in bot.py and games/. Views sent through them are tracked so
+# button events can find the view they were pressed on.
+
+class StubUser:
+    def __init__(self, uid, admin=False):
+        self.id = uid
+        self.mention = f"<@{uid}>"
+        self.name = self.display_name = f"user{uid % 100000}"
+        self.bot = False
+        self.guild_permissions = discord.Permissions(administrator=bool(admin))
+
+    async def send(self, content=None, **kwargs):
+        return StubMessage(None, content, kwargs)
+
+
+class StubRole:
+    def __init__(self, rid):
+        self.id = rid
+        self.mention = f"<@&{rid}>"
+
+
+class StubGuild:
+    def __init__(self, gid):
+        self.id = gid
+
+    async def fetch_members(self, limit=None):
+        # Role membership is not recorded; role targets resolve to nobody.
+        return
+        yield
+
+
+class StubChannel:
+    def __init__(self, replay, cid, guild):
+        self.replay = replay
+        self.id = cid
+        self.guild = guild
+
+    async def send(self, content=None, **kwargs):
+        return self.replay.post(self, content, kwargs)
+
+    async def create_thread(self, name, **kwargs):
+        return self.replay.channel(self.replay.new_id(), self.guild)
+
+
+class StubMessage:
+    def __init__(self, channel, content, kwargs, origin=None):
+        self.id = 0
+        self.channel = channel
+        self.content = content
+        self.view = kwargs.get("view")
+        self.origin = origin  # user whose interaction posted it, if any
+
+    async def edit(self, content=None, **kwargs):
+        if "view" in kwargs:
+            self.view = kwargs["view"]
+        return self
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+
+class StubResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    def ack(self):
+        if not self.done:
+            self.done = True
+            self.interaction.acked = time.perf_counter()
+
+    async def send_message(self, content=None, **kwargs):
+        self.ack()
+        i = self.interaction
+        i.original = i.channel.replay.post(i.channel, content, kwargs, i.user.id)
+
+    async def defer(self, **kwargs):
+        self.ack()
+
+    async def edit_message(self, content=None, **kwargs):
+        self.ack()
+        if self.interaction.message:
+            await self.interaction.message.edit(content, **kwargs)
+
+
+class StubFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        i = self.interaction
+        return i.channel.replay.post(i.channel, content, kwargs, i.user.id)
+
+
+class StubInteraction:
+    def __init__(self, user, guild, channel, message=None):
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id
+        self.channel = channel
+        self.channel_id = channel.id
+        self.message = message
+        self.response = StubResponse(self)
+        self.followup = StubFollowup(self)
+        self.original = None
+        self.acked = None
+
+    async def original_response(self):
+        if self.original is None:
+            self.original = StubMessage(self.channel, None, {})
+        return self.original
+
+    async def edit_original_response(self, content=None, **kwargs):
+        return await (await self.original_response()).edit(content, **kwargs)
+
+# ==========================================
+# ---------- REPLAYER ----------------------
+# ==========================================
+
+class Replay:
+    def __init__(self, app, speed):
+        self.app = app
+        self.speed = speed
+        self.users = {}
+        self.guilds = {}
+        self.channels = {}
+        self.messages = []  # every message that carried a view, oldest first
+        self.bound = {}  # recorded message id -> replayed message
+        self.next_id = 0
+        self.latency = []
+        self.counts = Counter()
+        self.errors = Counter()
+        self.tasks = set()
+
+    def new_id(self):
+        self.next_id += 1
+        return ANON_BASE * 9 + self.next_id  # never collides with recorded stand-ins
+
+    def user(self, uid, admin=None):
+        # admin is only known for the user who triggered an event.
+        u = self.users.get(uid)
+        if u is None:
+            u = self.users[uid] = StubUser(uid, admin)
+        elif admin is not None:
+            u.guild_permissions = discord.Permissions(administrator=bool(admin))
+        return u
+
+    def guild(self, gid):
+        if gid not in self.guilds:
+            self.guilds[gid] = StubGuild(gid)
+        return self.guilds[gid]
+
+    def channel(self, cid, guild):
+        if cid not in self.channels:
+            self.channels[cid] = StubChannel(self, cid, guild)
+        return self.channels[cid]
+
+    def post(self, channel, content, kwargs, origin=None):
+        message = StubMessage(channel, content, kwargs, origin)
+        message.id = self.new_id()
+        if message.view is not None:
+            self.messages.append(message)
+        return message
+
+    def find(self, channel, user, label, recorded):
+        # A recorded message id sticks to the first message it was matched
+        # to. Otherwise take the newest live view with that button, preferring
+        # the event's channel, messages nobody claimed yet and messages the
+        # clicking user posted. Games that ended sooner in the replay than in
+        # the recording leave their later clicks unmatched.
+        if recorded in self.bound:
+            message = self.bound[recorded]
+            return message if message.view and not message.view.is_finished() else None
+        claimed = set(map(id, self.bound.values()))
+        live = [m for m in reversed(self.messages) if m.view and not m.view.is_finished()
+                and any(getattr(item, "label", None) == label for item in m.view.children)]
+        for pool in ([m for m in live if m.channel is channel], live):
+            for m in sorted(pool, key=lambda m: (id(m) in claimed, m.origin != user.id)):
+                self.bound[recorded] = m
+                return m
+        return None
+
+    def arguments(self, command, payload):
+        names = {p.name for p in command.parameters}
+        kwargs = {}
+        for name, value in payload.items():
+            if name not in names:
+                continue
+            if isinstance(value, dict):
+                if "u" in value:
+                    value = self.user(value["u"])
+                elif "r" in value:
+                    value = StubRole(value["r"])
+                elif "ch" in value:
+                    value = self.channels.get(value["ch"])
+                else:
+                    value = None  # attachment
+            kwargs[name] = value
+        return kwargs
+
+    async def dispatch(self, row):
+        _, kind, gid, cid, uid, admin, name, payload = row
+        guild = self.guild(gid)
+        interaction = StubInteraction(self.user(uid, admin), guild, self.channel(cid, guild))
+        self.counts[f"{'/' if kind == 'c' else '🔘 '}{name}"] += 1
+        start = time.perf_counter()
+        try:
+            if kind == "c":
+                command = self.app.bot.tree.get_command(name)
+                if command is None:
+                    self.errors[f"unknown command /{name}"] += 1
+                    return
+                await command.callback(interaction, **self.arguments(command, payload))
+            else:
+                message = self.find(interaction.channel, interaction.user, name, payload)
+                if message is None:
+                    self.errors[f"no live view for {name!r}"] += 1
+                    return
+                interaction.message = message
+                item = next(i for i in message.view.children if getattr(i, "label", None) == name)
+                await item.callback(interaction)
+        except Exception as e:
+            self.errors[f"{type(e).__name__}: {e}"[:120]] += 1
+        finally:
+            self.latency.append((interaction.acked or time.perf_counter()) - start)
+
+    async def run(self, events, drain):
+        start = time.perf_counter()
+        for t, row in events:
+            if self.speed:
+                delay = t / self.speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+            task = asyncio.create_task(self.dispatch(row))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        dispatched = time.perf_counter() - start
+        await self.drain(drain)
+        return dispatched
+
+    def background(self):
+        # Handlers still running, plus the work they left behind: coinflip
+        # fill batches and tournament timer callbacks in flight.
+        tasks = set(self.tasks)
+        coinflip = sys.modules.get("games.coinflip")
+        if coinflip:
+            tasks.update(b._batch_task for b in coinflip.books.values() if b._batch_task)
+        tournament = sys.modules.get("games.tournament")
+        if tournament:
+            tasks.update(tournament.scheduler._running)
+        return {t for t in tasks if not t.done()}
+
+    async def drain(self, seconds):
+        deadline = time.perf_counter() + seconds
+        while pending := self.background():
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                for task in pending:
+                    task.cancel()
+                self.errors["still running after drain"] += len(pending)
+                break
+            await asyncio.wait(pending, timeout=timeout)
+        # What is left only happens on a timer: resting coinflip orders and
+        # running tournaments. Unloading the games settles those the way a
+        # shutdown does (refunds), so the final ledger holds no escrow.
+        for name in list(self.app.bot.extensions):
+            await self.app.bot.unload_extension(name)
+        coinflip = sys.modules.get("games.coinflip")
+        if coinflip:
+            for b in coinflip.books.values():
+                for task in (b._batch_task, b._expiry_task):
+                    if task:
+                        task.cancel()
+
+
+def ledger_snapshot(economy, guild_ids):
+    return {
+        str(gid): {uid: {"balance": u["balance"], "escrow": u.get("escrow", 0), **u["total"]}
+                   for uid, u in sorted(economy(gid).users.items())}
+        for gid in sorted(guild_ids)
+    }
+
+
+def ledger_diff(before, after):
+    lines = []
+    for gid, users in after.items():
+        old = before.get(gid, {})
+        changed = {uid: u for uid, u in users.items() if old.get(uid) != u}
+        delta = sum(u["balance"] for u in users.values()) - sum(u["balance"] for u in old.values())
+        lines.append(f"guild {gid}: {len(changed)} user(s) changed, {len(users) - len(old)} new, net balance {delta:+d}")
+    return lines
+
+
+async def replay(args):
+    import bot as app  # imported late: DATA_DIR and friends are set by main()
+    from ledger import economy, history
+
+    events = read_trace(args.trace, args.max_gap)
+    if not events:
+        raise SystemExit(f"{args.trace}: no events")
+    guild_ids = {row[2] for _, row in events}
+    random.seed(args.seed)
+    await app.bot.setup_hook()  # loads the enabled game extensions
+
+    before = ledger_snapshot(economy, guild_ids)
+    r = Replay(app, args.speed)
+    started = time.perf_counter()
+    dispatched = await r.run(events, args.drain)
+    elapsed = time.perf_counter() - started
+    history.flush_all()
+    economy.flush_all()
+    after = ledger_snapshot(economy, guild_ids)
+
+    lat = sorted(r.latency) or [0.0]
+    pct = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1000
+    span = events[-1][0]
+    print(f"events       {len(events)} over {span:.1f}s recorded, speed {'max' if not args.speed else f'{args.speed:g}x'}")
+    print(f"elapsed      {elapsed:.2f}s ({dispatched:.2f}s dispatching), {len(events) / elapsed:.0f} events/s")
+    print(f"latency      p50 {pct(0.5):.2f}ms  p95 {pct(0.95):.2f}ms  p99 {pct(0.99):.2f}ms  max {lat[-1] * 1000:.2f}ms")
+    print("mix          " + ", ".join(f"{name} {n}" for name, n in r.counts.most_common(8)))
+    for line in ledger_diff(before, after):
+        print(f"ledger       {line}")
+    for error, n in r.errors.most_common(10):
+        print(f"error        {n}x {error}")
+
+    if args.ledger_out:
+        with open(args.ledger_out, "w") as f:
+            json.dump(after, f, indent=1, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            other = json.load(f)
+        mismatched = [(gid, uid) for gid in set(after) | set(other)
+                      for uid in set(after.get(gid, {})) | set(other.get(gid, {}))
+                      if after.get(gid, {}).get(uid) != other.get(gid, {}).get(uid)]
+        print(f"compare      {len(mismatched)} user(s) differ from {args.compare}")
+        for gid, uid in sorted(mismatched)[:10]:
+            print(f"             guild {gid} user {uid}: {other.get(gid, {}).get(uid)} -> {after.get(gid, {}).get(uid)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded interaction trace against stub Discord objects.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("replay")
+    p.add_argument("trace")
+    p.add_argument("--speed", type=float, default=1.0, help="1 = real time, 10 = ten times faster, 0 = as fast as possible")
+    p.add_argument("--max-gap", type=float, default=5.0, help="idle gaps longer than this many seconds are shortened")
+    p.add_argument("--drain", type=float, default=30.0, help="seconds to wait for handlers and their batches still running at the end")
+    p.add_argument("--seed", type=int, default=0, help="game RNG seed, keep it fixed when comparing builds")
+    p.add_argument("--data-dir", help="ledger to start from (copied, never modified)")
+    p.add_argument("--ledger-out", help="write the final ledger here as JSON")
+    p.add_argument("--compare", help="ledger JSON from another run to diff against")
+    args = parser.parse_args()
+
+    # ledger and bot read their configuration at import, so set it up first.
+    args.trace = os.path.abspath(args.trace)
+    for name in ("ledger_out", "compare", "data_dir"):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+    scratch = tempfile.mkdtemp(prefix="trace-replay-")
+    data_dir = os.path.join(scratch, "guilds")
+    if args.data_dir:
+        shutil.copytree(args.data_dir, data_dir)
+    os.environ.update(DATA_DIR=data_dir, DISCORD_TOKEN=os.getenv("DISCORD_TOKEN") or "replay",
+                      REPLICATION_PORT="", TRACE_FILE="", DEV_GUILD_ID="")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(scratch)
+
+    asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()